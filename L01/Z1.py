@@ -1,5 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from ekg_io import loadSignalCached, signalSegment
+from ekg_plotting import EnvelopeLine
 
 # Zmienne potrzebne do poprawnego działania programu
 fileEKG1 = "ekg1.txt"
@@ -8,15 +10,10 @@ fs1 = 1000
 fs100 = 360
 
 def loadSignal(filename, fs):
-    data = np.loadtxt(filename)
-    # W przypadku sygnału jednokanałowego
-    if data.ndim == 1:
-        time = np.arange(len(data)) / fs
-        return time, data
-    # W przypadku sygnału wielokanałowego
-    else:
-        time = np.arange(data.shape[0]) / fs
-        return time, data
+    # Sygnał otwierany przez np.memmap z binarnej kopii pliku (ekg_io.loadSignalCached),
+    # tworzonej przy pierwszym wczytaniu - sygnał jednokanałowy ma kształt (n,),
+    # wielokanałowy (n, kanały)
+    return loadSignalCached(filename, fs)
 
 
 def plotSignal(time, signal, signalStart=0, signalEnd=None, title="EKG", yMinValue=None, yMaxValue=None):
@@ -24,9 +21,8 @@ def plotSignal(time, signal, signalStart=0, signalEnd=None, title="EKG", yMinVal
     if signalEnd is None:
         signalEnd = time[-1]
 
-    # Tworzenie maski z zakresem pomiędzy signalStart i signalEnd
-    mask = (time >= signalStart) & (time <= signalEnd)
-    print(mask)
+    # Wycinek sygnału pomiędzy signalStart i signalEnd (widok, bez maski po całym nagraniu)
+    segmentTime, segment = signalSegment(time, signal, signalStart, signalEnd)
 
     # Sprawdzanie, czy sygnał jest jedno, czy wielokanałowy
     if signal.ndim == 1:
@@ -40,7 +36,8 @@ def plotSignal(time, signal, signalStart=0, signalEnd=None, title="EKG", yMinVal
 
     if numberOfChannels == 1:
         plt.subplot(1, 1, 1)
-        plt.plot(time[mask], signal[mask])
+        # Rysowana jest obwiednia min/max dopasowana do szerokości wykresu
+        EnvelopeLine(plt.gca(), segmentTime, segment)
         plt.xlabel("Czas (s)")
         plt.ylabel("Amplituda")
         plt.title(f"{title} ({signalStart}-{signalEnd} s)")
@@ -50,7 +47,7 @@ def plotSignal(time, signal, signalStart=0, signalEnd=None, title="EKG", yMinVal
     else:
         for i in range(numberOfChannels):
             plt.subplot(numberOfChannels, 1, i + 1)
-            plt.plot(time[mask], signal[mask, i])
+            EnvelopeLine(plt.gca(), segmentTime, segment[:, i])
             plt.xlabel("Czas (s)")
             plt.ylabel(f"Amplituda (Lead {i + 1})")
             plt.title(f"{title} ({signalStart}-{signalEnd} s) - Kanał {i + 1}")
@@ -66,15 +63,15 @@ def plotAllSignal(time, signal, signalStart=0, signalEnd=None, title="EKG", yMin
     # Jeżeli nie sprecyzowano, do której sekundy wyświetlić sygnał: wyświetl go w całości
     if signalEnd is None:
         signalEnd = time[-1]
-    # Tworzenie maski z zakresem pomiędzy signalStart i signalEnd
-    mask = (time >= signalStart) & (time <= signalEnd)
+    # Wycinek sygnału pomiędzy signalStart i signalEnd
+    segmentTime, segment = signalSegment(time, signal, signalStart, signalEnd)
 
     plt.figure(figsize=(12, 6))
 
     numberOfChannels = signal.shape[1] if signal.ndim > 1 else 1
 
     for i in range(numberOfChannels):
-        plt.plot(time[mask], signal[mask, i], label=f"Kanał {i + 1}" if numberOfChannels > 1 else "Signal")
+        EnvelopeLine(plt.gca(), segmentTime, segment[:, i] if segment.ndim > 1 else segment, label=f"Kanał {i + 1}" if numberOfChannels > 1 else "Signal")
 
     plt.xlabel("Czas (s)")
     plt.ylabel("Amplituda")
@@ -86,9 +83,8 @@ def plotAllSignal(time, signal, signalStart=0, signalEnd=None, title="EKG", yMin
     plt.show()
 
 def savePlotSegmentToTxt(time, signal, signalStart, signalEnd, filename, fmt):
-    # Tworzenie maski z zakresem pomiędzy signalStart i signalEnd
-    mask = (time >= signalStart) & (time <= signalEnd)
-    segment = signal[mask]
+    # Wycinek sygnału pomiędzy signalStart i signalEnd
+    _, segment = signalSegment(time, signal, signalStart, signalEnd)
     np.savetxt(filename, segment, fmt=fmt)
     print(f"Zapisano wycinek do {filename}")
 
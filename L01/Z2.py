@@ -1,5 +1,6 @@
 import matplotlib.pyplot as plt
 import numpy as np
+from spectrum import realSpectrum, inverseRealSpectrum
 
 # Częstotliwość próbkowania (Hz)
 fs = 1000
@@ -17,13 +18,12 @@ print(sinSignal50Hz)
 
 #ZADANIE2###############################################################################################################
 
-# Obliczanie i rysowanie transformaty Fouriera
-sinSignalFFT = np.fft.fft(sinSignal50Hz)
-frequencies = np.fft.fftfreq(len(sinSignal50Hz), 1 / fs)
+# Obliczanie i rysowanie transformaty Fouriera (rfft - tylko dodatnia połowa widma)
+frequencies, sinSignalFFT = realSpectrum(sinSignal50Hz, fs)
 sinSignalAmplitudeSpectrum = np.abs(sinSignalFFT) / len(sinSignal50Hz)
 
 plt.figure(figsize=(10, 5))
-plt.plot(frequencies[:len(frequencies) // 2], sinSignalAmplitudeSpectrum[:len(frequencies) // 2])
+plt.plot(frequencies, sinSignalAmplitudeSpectrum)
 plt.title("Widmo amplitudowe sygnału 50 Hz")
 plt.xlabel("Częstotliwość (Hz)")
 plt.ylabel("Amplituda")
@@ -38,11 +38,11 @@ sinSignal60Hz = np.sin(2 * np.pi * sinFrequency60Hz * t)
 mixedSinSignal = sinSignal50Hz + sinSignal60Hz
 
 # Obliczanie i rysowanie transformaty Fouriera sygnału mieszanego
-mixedSinSignalFFT = np.fft.fft(mixedSinSignal)
+_, mixedSinSignalFFT = realSpectrum(mixedSinSignal, fs)
 mixedSinSignalAmplitudeSpectrum = np.abs(mixedSinSignalFFT) / len(mixedSinSignal)
 
 plt.figure(figsize=(10, 5))
-plt.plot(frequencies[:len(frequencies) // 2], mixedSinSignalAmplitudeSpectrum[:len(frequencies) // 2])
+plt.plot(frequencies, mixedSinSignalAmplitudeSpectrum)
 plt.title("Widmo amplitudowe sygnału mieszanego 50 Hz i 60 Hz")
 plt.xlabel("Częstotliwość (Hz)")
 plt.ylabel("Amplituda")
@@ -59,12 +59,11 @@ for fsNew in samplingRates:
     tNew = np.linspace(0, TNew, 65536, endpoint=False)
     signalNew = np.sin(2 * np.pi * sinFrequency50Hz * tNew) + np.sin(2 * np.pi * sinFrequency60Hz * tNew)
 
-    fftNew = np.fft.fft(signalNew)
-    frequencyNew = np.fft.fftfreq(len(signalNew), 1 / fsNew)
+    frequencyNew, fftNew = realSpectrum(signalNew, fsNew)
     amplitudeSpectrumNew = np.abs(fftNew) / len(signalNew)
 
     plt.figure(figsize=(10, 5))
-    plt.plot(frequencyNew[:len(frequencyNew) // 2], amplitudeSpectrumNew[:len(frequencyNew) // 2])
+    plt.plot(frequencyNew, amplitudeSpectrumNew)
     plt.title(f"Widmo amplitudowe (Częstotliwość próbkowania: {fsNew} Hz)")
     plt.xlabel("Częstotliwość (Hz)")
     plt.ylabel("Amplituda")
@@ -74,8 +73,8 @@ for fsNew in samplingRates:
 #ZADANIE5###############################################################################################################
 
 # Obliczanie odwrotnej transformaty Fouriera i porównanie z oryginalnymi sygnałami
-reconstructedSinSignal = np.fft.ifft(sinSignalFFT).real
-reconstructedMixedSinSignal = np.fft.ifft(mixedSinSignalFFT).real
+reconstructedSinSignal = inverseRealSpectrum(sinSignalFFT, len(sinSignal50Hz))
+reconstructedMixedSinSignal = inverseRealSpectrum(mixedSinSignalFFT, len(mixedSinSignal))
 
 plt.figure(figsize=(10, 5))
 plt.plot(t[:1000], sinSignal50Hz[:1000], label="Oryginalny sygnał 50Hz")
@@ -1,6 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.fftpack import fft, ifft
+from spectrum import realSpectrum, inverseRealSpectrum
+from ekg_io import loadSignalCached
 
 # Częstotliwość próbkowania (Hz)
 fs = 360
@@ -8,11 +9,8 @@ fs = 360
 #ZADANIE1###############################################################################################################
 
 filename = "ekg100.txt"
-with open(filename, "r") as file:
-    signal = np.array([float(line.strip()) for line in file])
-
-# Oś czasu
-t = np.arange(len(signal)) / fs
+# Sygnał wraz z osią czasu (z binarnej kopii pliku, patrz ekg_io.loadSignalCached)
+t, signal = loadSignalCached(filename, fs)
 
 plt.figure(figsize=(12, 4))
 plt.plot(t, signal, label="Sygnał EKG")
@@ -27,13 +25,9 @@ plt.show()
 
 # N - Ilość próbek w sygnale signal
 N = len(signal)
-# Oś częstotliwości
-frequencies = np.fft.fftfreq(N, 1 / fs)
-# Transformata Fouriera sygnału signal
-X = fft(signal)
-XMagnitude = np.abs(X)[:N // 2]  # Widmo amplitudowe (połowa widma)
-# Zakres [0, fs/2]
-positiveFrequencies = frequencies[:N // 2]
+# Transformata Fouriera sygnału signal (rfft - tylko zakres [0, fs/2])
+positiveFrequencies, X = realSpectrum(signal, fs)
+XMagnitude = np.abs(X)  # Widmo amplitudowe (połowa widma)
 
 # Wykres widma amplitudowego
 plt.figure(figsize=(12, 4))
@@ -48,7 +42,7 @@ plt.show()
 #ZADANIE3###############################################################################################################
 
 # Rekonstrukcja sygnału odwrotną transformatą Fouriera
-reconstructedSignal = np.real(ifft(X))
+reconstructedSignal = inverseRealSpectrum(X, N)
 
 # Porównanie sygnału oryginalnego i sygnału po odwrotnej transformacie Fouriera
 plt.figure(figsize=(12, 4))
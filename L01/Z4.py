@@ -1,7 +1,9 @@
 import matplotlib.pyplot as plt
 import numpy as np
-from scipy.fftpack import fft
-from scipy.signal import butter, filtfilt
+from scipy.signal import filtfilt
+from ekg_filters import bandFilter, designButterworth
+from ekg_io import loadSignalCached
+from spectrum import amplitudeSpectrum
 
 # Parametry programu
 # Częstotliwość próbkowania [Hz]
@@ -15,7 +17,8 @@ upperBound = 60
 
 # Wczytanie pliku z szumami
 filename = "ekg_noise.txt"
-noiseData = np.loadtxt(filename)
+# Dane otwierane przez np.memmap z binarnej kopii pliku (patrz ekg_io.loadSignalCached)
+_, noiseData = loadSignalCached(filename, fs)
 # Pierwsza kolumna pliku
 time = noiseData[:, 0]
 # Druga kolumna pliku
@@ -32,15 +35,11 @@ plt.show()
 
 # N - Ilość próbek w sygnale signalValues
 N = len(signalValues)
-frequencyBins = np.fft.fftfreq(N, 1 / fs)
-# X - Wyliczona szybka transformata Fouriera
-X = fft(signalValues)
 # XMagnitude - Amplitudy szybkiej transformaty Fouriera
-XMagnitude = np.abs(X)[:N//2]
-# Transformata Fouriera generuje się w zakresie dodatnim i ujemnym (fs/2)
-# zachowujemy tylko wartości z zakresu dodatniego poniewarz transformata
-# jest w tych zakresach symetryczna
-frequencyBinsPositiveHalf = frequencyBins[:N // 2]
+# Transformata Fouriera generuje się w zakresie dodatnim i ujemnym (fs/2),
+# ale dla sygnału rzeczywistego jest w tych zakresach symetryczna, więc
+# liczona jest od razu tylko połowa dodatnia (rfft)
+frequencyBinsPositiveHalf, XMagnitude = amplitudeSpectrum(signalValues, fs)
 
 plt.figure(figsize=(12, 4))
 plt.plot(frequencyBinsPositiveHalf, XMagnitude, label="Widmo amplitudowe przed filtracją")
@@ -51,11 +50,10 @@ plt.grid()
 plt.show()
 
 def butterworthLowpassFilter(data, cutoffFrequency, order=4):
-    nyquistFrequency = 0.5 * fs
-    # Znormalizowana częstotliwość odcinana przez filter
-    normalizedCutoffFrequency = cutoffFrequency / nyquistFrequency
-    b, a = butter(order, normalizedCutoffFrequency, btype='low', analog=False)
-    return filtfilt(b, a, data)
+    # Współczynniki projektowane raz dla danych (order, cutoff, fs) - patrz ekg_filters
+    # axis=0 - dane (próbki,) lub (próbki, odprowadzenia) filtrowane wzdłuż czasu
+    b, a = designButterworth(order, cutoffFrequency, fs, btype='low')
+    return filtfilt(b, a, data, axis=0)
 
 signalAfterLowpassFilter = butterworthLowpassFilter(signalValues, upperBound)
 
@@ -71,8 +69,7 @@ plt.grid()
 plt.show()
 
 # Widmo sygnału po filtracji dolnoprzepustowej
-XAfterLowpassFilter = fft(signalAfterLowpassFilter)
-XMagnitudeAfterLowpassFilter = np.abs(XAfterLowpassFilter)[:N // 2]
+_, XMagnitudeAfterLowpassFilter = amplitudeSpectrum(signalAfterLowpassFilter, fs)
 
 plt.figure(figsize=(12, 4))
 plt.plot(frequencyBinsPositiveHalf, XMagnitude, label="Widmo przed filtracją", alpha=0.7)
@@ -90,18 +87,20 @@ print(f'Min: {np.min(signalValues)}, Max: {np.max(signalValues)}')
 
 #ZADANIE3###############################################################################################################
 
-def butterworthHighpassFilter(data, cutoffFrequency, order=4):
-    nyquistFrequency = 0.5 * fs
-    normalizedCutoffFrequency = cutoffFrequency / nyquistFrequency
-    b, a = butter(order, normalizedCutoffFrequency, btype='high', analog=False)
-    return filtfilt(b, a, data)
+# Filtr pasmowy 5-60 Hz: sekcje SOS filtru dolnoprzepustowego (60 Hz)
+# i górnoprzepustowego (5 Hz) złożone w jedną kaskadę, przez którą sygnał
+# przechodzi jednym przebiegiem zero-fazowym (zamiast dwóch wywołań filtfilt).
+# Na brzegach sygnału (ok. 0,7 s z każdej strony) wynik nieco różni się od
+# dwóch osobnych filtfilt - patrz ekg_filters.designLowHighCascade
+def butterworthBandpassFilter(data, lowCutoff, highCutoff, order=4):
+    return bandFilter(data, lowCutoff, highCutoff, fs, order, design='cascade')
 
-signalAfterHighpassFilter = butterworthHighpassFilter(signalAfterLowpassFilter, lowerBound)
+signalAfterBandpassFilter = butterworthBandpassFilter(signalValues, lowerBound, upperBound)
 
 # Wykres sygnału po filtrze pasmowym w zakresie od 5 do 60 Hz
 plt.figure(figsize=(12, 4))
 plt.plot(time, signalValues, label="Oryginalny sygnał")
-plt.plot(time, signalAfterHighpassFilter, label="Po filtrze pasmowym (5-60 Hz)", linestyle="dashed")
+plt.plot(time, signalAfterBandpassFilter, label="Po filtrze pasmowym (5-60 Hz)", linestyle="dashed")
 plt.xlabel("Czas (s)")
 plt.ylabel("Amplituda")
 plt.title("Sygnał po filtracji pasmowej (5-60 Hz)")
@@ -110,8 +109,7 @@ plt.grid()
 plt.show()
 
 # Widmo sygnału po filtracji pasmowej w zakresie od 5 do 60 Hz
-XAfterBandpassFilter = fft(signalAfterHighpassFilter)
-XMagnitudeAfterBandpassFilter = np.abs(XAfterBandpassFilter)[:N // 2]
+_, XMagnitudeAfterBandpassFilter = amplitudeSpectrum(signalAfterBandpassFilter, fs)
 
 plt.figure(figsize=(12, 4))
 plt.plot(frequencyBinsPositiveHalf, XMagnitude, label="Widmo przed filtracją", color="red", alpha=0.6)
@@ -133,7 +131,7 @@ plt.grid()
 plt.show()
 
 # Różnica między sygnałami przed i po filtracji
-diff = signalValues - signalAfterHighpassFilter
+diff = signalValues - signalAfterBandpassFilter
 
 plt.figure(figsize=(12, 4))
 plt.plot(time, diff, label="Różnica przed i po filtracji")
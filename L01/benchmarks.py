@@ -0,0 +1,238 @@
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+# Pomiary czasu dla szybszych wersji funkcji z zadań L01
+# Uruchomienie: python benchmarks.py [nazwa_pomiaru ...]
+# Bez argumentów wykonywane są wszystkie pomiary
+
+
+# Najkrótszy czas z kilku powtórzeń (w sekundach) oraz wynik ostatniego wywołania
+def measure(function, *args, repeat=1, **kwargs):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+# Syntetyczne nagranie 12-kanałowe int16 (np.zeros - strony pamięci są
+# przydzielane dopiero przy pierwszym dostępie, jak przy np.memmap)
+def syntheticRecording(hours, fs=1000, numberOfChannels=12):
+    numberOfSamples = int(hours * 3600 * fs)
+    signal = np.zeros((numberOfSamples, numberOfChannels), dtype=np.int16)
+    time = np.arange(numberOfSamples) / fs
+    return time, signal
+
+
+# Wycinanie fragmentu sygnału: maska logiczna po całym nagraniu a indeksy
+def benchmarkSegment(hours=1, fs=1000, windows=((1, 2), (1800, 1860), (3598, 3599))):
+    from ekg_io import signalSegment
+
+    def maskSegment(time, signal, signalStart, signalEnd):
+        mask = (time >= signalStart) & (time <= signalEnd)
+        return time[mask], signal[mask]
+
+    time, signal = syntheticRecording(hours, fs)
+    print(f"Z1 wycinek sygnału, syntetyczne nagranie {hours} h, 12 kanałów, fs={fs} Hz {signal.shape}")
+    print(f"{'okno [s]':>16} | {'maska [ms]':>10} | {'indeksy [ms]':>12} | {'przysp.':>9} | zgodne")
+    for signalStart, signalEnd in windows:
+        if signalEnd > time[-1]:
+            continue
+        maskTime, (expectedTime, expected) = measure(maskSegment, time, signal, signalStart, signalEnd)
+        sliceTime, (segmentTime, segment) = measure(signalSegment, time, signal, signalStart, signalEnd, repeat=5)
+        identical = np.array_equal(expectedTime, segmentTime) and np.array_equal(expected, segment)
+        print(f"{signalStart:>7}-{signalEnd:<8} | {maskTime * 1e3:>10.1f} | {sliceTime * 1e3:>12.4f} | "
+              f"{maskTime / sliceTime:>8.0f}x | {identical}")
+
+
+# Widmo amplitudowe 12 kanałów ekg1.txt: pełne fft dla każdego kanału
+# (jak w Z3/Z4) a jedno wywołanie rfft dla wszystkich kanałów
+def benchmarkSpectrum(filename="ekg1.txt", fs=1000, repeats=20):
+    from scipy.fftpack import fft
+    from ekg_io import readSignal
+    from spectrum import amplitudeSpectrum
+
+    _, signal = readSignal(filename, fs)
+    # Dłuższy sygnał (kilkukrotne powtórzenie nagrania), żeby czasy były mierzalne
+    signal = np.tile(signal, (repeats, 1))
+    N = signal.shape[0]
+
+    def perChannelFFT():
+        return [np.abs(fft(signal[:, i]))[:N // 2] for i in range(signal.shape[1])]
+
+    fullTime, full = measure(perChannelFFT, repeat=3)
+    batchedTime, (_, batched) = measure(amplitudeSpectrum, signal, fs, repeat=3)
+    fastTime, _ = measure(amplitudeSpectrum, signal, fs, fastLength=True, repeat=3)
+    identical = np.allclose(np.stack(full, axis=1), batched[:N // 2])
+    print(f"Widmo amplitudowe, {filename} x{repeats} {signal.shape}")
+    print(f"fftpack.fft dla każdego kanału: {fullTime * 1e3:8.1f} ms, {N * signal.shape[1] * 16 / 2**20:6.1f} MiB widma")
+    print(f"rfft wszystkich kanałów:        {batchedTime * 1e3:8.1f} ms, {batched.size * 16 / 2**20:6.1f} MiB widma")
+    print(f"rfft z next_fast_len:           {fastTime * 1e3:8.1f} ms")
+    print(f"zgodne: {identical}")
+
+
+# Strumieniowy Welch na długim syntetycznym sygnale z zakłóceniem 50 Hz:
+# szczyt zajętej pamięci przy podawaniu bloków a jedno FFT całego nagrania
+def benchmarkStreamingSpectrum(hours=2, fs=360, blockSize=65536):
+    from spectrum import StreamingSpectrum, amplitudeSpectrum
+
+    numberOfSamples = int(hours * 3600 * fs)
+
+    def blocks():
+        for start in range(0, numberOfSamples, blockSize):
+            t = np.arange(start, min(start + blockSize, numberOfSamples)) / fs
+            yield 0.1 * np.sin(2 * np.pi * 50 * t) + np.sin(2 * np.pi * 1.2 * t)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    estimator = StreamingSpectrum(fs, segmentLength=4096).feed(blocks())
+    streamingTime = time.perf_counter() - start
+    streamingPeak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    signal = np.concatenate(list(blocks()))
+    amplitudeSpectrum(signal, fs)
+    fullTime = time.perf_counter() - start
+    fullPeak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    frequencies, amplitude = estimator.amplitudeSpectrum()
+    line = (frequencies > 45) & (frequencies < 55)
+    print(f"Strumieniowe widmo (Welch), {hours} h, fs={fs} Hz, {numberOfSamples} próbek")
+    print(f"StreamingSpectrum: {streamingTime:6.2f} s, szczyt pamięci {streamingPeak / 2**20:8.1f} MiB")
+    print(f"rfft całości:      {fullTime:6.2f} s, szczyt pamięci {fullPeak / 2**20:8.1f} MiB")
+    print(f"prążek sieciowy: {frequencies[line][np.argmax(amplitude[line])]:.2f} Hz, "
+          f"amplituda {amplitude[line].max():.3f} (zadana 0.1)")
+
+
+# Filtracja pasmowa 5-60 Hz nagrania ekg_noise.txt powielonego do kilku
+# milionów próbek: LP, a potem HP przez filtfilt (jak dotąd w Z4) a jedna
+# kaskada SOS w jednym przebiegu zero-fazowym (z zapisem w miejscu), cała
+# naraz i blokami po blockSize próbek - dopiero bloki obniżają szczyt pamięci
+def benchmarkBandpass(filename="ekg_noise.txt", fs=360, numberOfSamples=5_000_000, lowCutoff=5, highCutoff=60,
+                      blockSize=65536):
+    from scipy.signal import filtfilt
+    from ekg_filters import bandFilter, designButterworth
+    from ekg_io import readSignal
+
+    _, noiseData = readSignal(filename, fs)
+    signal = np.resize(noiseData[:, 1], numberOfSamples)
+
+    def cascadedFiltfilt(data):
+        data = filtfilt(*designButterworth(4, highCutoff, fs, btype='low'), data)
+        return filtfilt(*designButterworth(4, lowCutoff, fs, btype='high'), data)
+
+    def singlePass(data):
+        return bandFilter(data, lowCutoff, highCutoff, fs, design='cascade', out=data)
+
+    def blockwise(data):
+        return bandFilter(data, lowCutoff, highCutoff, fs, design='cascade', blockSize=blockSize, out=data)
+
+    def run(function):
+        data = signal.copy()
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = function(data)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return elapsed, peak, result
+
+    # Przebiegi po sygnale: filtfilt to przebieg w przód i wstecz na filtr
+    cascadedTime, cascadedPeak, expected = run(cascadedFiltfilt)
+    singleTime, singlePeak, result = run(singlePass)
+    blockTime, blockPeak, blocked = run(blockwise)
+    edge = 10 * fs
+    difference = np.abs(result - expected)
+    print(f"Filtr pasmowy {lowCutoff}-{highCutoff} Hz, {filename} powielony do {numberOfSamples} próbek "
+          f"({signal.nbytes / 2**20:.1f} MiB)")
+    print(f"{'wariant':>20} | {'przebiegi':>9} | {'czas [s]':>8} | {'szczyt pamięci [MiB]':>20}")
+    print(f"{'LP + HP (filtfilt)':>20} | {4:>9} | {cascadedTime:>8.2f} | {cascadedPeak / 2**20:>20.1f}")
+    print(f"{'kaskada SOS':>20} | {2:>9} | {singleTime:>8.2f} | {singlePeak / 2**20:>20.1f}")
+    print(f"{'kaskada SOS, bloki':>20} | {2:>9} | {blockTime:>8.2f} | {blockPeak / 2**20:>20.1f}")
+    print(f"bloki a cały sygnał: maks. różnica {np.abs(blocked - result).max():.2e}")
+    print(f"maks. różnica: {difference[edge:-edge].max():.2e} (bez {edge} próbek przy brzegach), "
+          f"{difference.max():.2e} (cały sygnał)")
+
+
+# Filtracja pasmowa wszystkich 12 odprowadzeń ekg1.txt: pętla po kanałach
+# z projektem filtru przy każdym wywołaniu (jak pomocnicze funkcje Z4) a jedno
+# wywołanie dla tablicy (próbki, kanały) oraz kanały rozdzielone między wątki
+def benchmarkMultichannel(filename="ekg1.txt", fs=1000, repeats=200, lowCutoff=5, highCutoff=60, workers=-1):
+    from scipy.signal import butter, sosfiltfilt
+    from ekg_filters import bandFilter
+    from ekg_io import readSignal
+
+    _, signal = readSignal(filename, fs)
+    signal = np.tile(signal, (repeats, 1))
+
+    def perLead():
+        leads = []
+        for i in range(signal.shape[1]):
+            sos = np.vstack([butter(4, highCutoff / (0.5 * fs), btype='low', output='sos'),
+                             butter(4, lowCutoff / (0.5 * fs), btype='high', output='sos')])
+            leads.append(sosfiltfilt(sos, signal[:, i]))
+        return np.stack(leads, axis=1)
+
+    loopTime, expected = measure(perLead, repeat=3)
+    batchedTime, batched = measure(bandFilter, signal, lowCutoff, highCutoff, fs, design='cascade', repeat=3)
+    threadedTime, threaded = measure(bandFilter, signal, lowCutoff, highCutoff, fs, design='cascade',
+                                     workers=workers, repeat=3)
+    print(f"Filtr pasmowy {lowCutoff}-{highCutoff} Hz, {filename} x{repeats} {signal.shape}")
+    print(f"pętla po odprowadzeniach:   {loopTime * 1e3:8.1f} ms")
+    print(f"tablica (próbki, kanały):   {batchedTime * 1e3:8.1f} ms, identyczne: {np.array_equal(expected, batched)}")
+    print(f"kanały w wątkach ({workers:>2}):     {threadedTime * 1e3:8.1f} ms, identyczne: {np.array_equal(expected, threaded)}")
+
+
+# Rysowanie długiego nagrania przez EnvelopeLine (backend Agg): czas pierwszego
+# rysowania oraz sprawdzenie, że po przybliżeniu obwiednia jest liczona od nowa
+# dla widocznego zakresu (instancja nie jest zachowywana - jak w Z1)
+def benchmarkEnvelope(hours=1, fs=1000, zoom=(10, 11)):
+    import gc
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from ekg_plotting import EnvelopeLine
+
+    numberOfSamples = int(hours * 3600 * fs)
+    time = np.arange(numberOfSamples) / fs
+    signal = np.sin(2 * np.pi * time)
+    fig, ax = plt.subplots()
+
+    def draw():
+        EnvelopeLine(ax, time, signal)
+        fig.canvas.draw()
+
+    drawTime, _ = measure(draw)
+    gc.collect()
+    (line,) = ax.get_lines()
+    fullTime = line.get_xdata()
+    ax.set_xlim(*zoom)
+    zoomTime = line.get_xdata()
+    plt.close(fig)
+    # Po przeliczeniu wszystkie punkty leżą w przybliżonym zakresie (z zapasem jednej próbki)
+    recomputed = zoom[0] - 1 / fs <= zoomTime[0] < zoomTime[-1] <= zoom[1] + 1 / fs
+    print(f"EnvelopeLine, syntetyczne nagranie {hours} h, fs={fs} Hz ({numberOfSamples} próbek)")
+    print(f"rysowanie:             {drawTime * 1e3:8.1f} ms, {len(fullTime)} punktów, {fullTime[0]:.0f}-{fullTime[-1]:.0f} s")
+    print(f"po przybliżeniu {zoom}: {len(zoomTime)} punktów, {zoomTime[0]:.3f}-{zoomTime[-1]:.3f} s, "
+          f"przeliczone: {recomputed}")
+
+
+BENCHMARKS = {
+    "z1_segment": benchmarkSegment,
+    "spectrum": benchmarkSpectrum,
+    "streaming_spectrum": benchmarkStreamingSpectrum,
+    "bandpass": benchmarkBandpass,
+    "multichannel": benchmarkMultichannel,
+    "envelope": benchmarkEnvelope,
+}
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        BENCHMARKS[name]()
+        print()
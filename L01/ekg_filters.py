@@ -0,0 +1,206 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import numpy as np
+from scipy.signal import butter, iirnotch, sos2zpk, sosfilt, sosfilt_zi, sosfiltfilt, tf2sos
+
+# Maksymalna liczba zapamiętanych projektów filtrów
+MAX_CACHED_DESIGNS = 128
+
+
+# Projekt filtru Butterwortha zapamiętywany dla parametrów (order, cutoff, fs, btype)
+# cutoffFrequency - częstotliwość odcięcia w Hz (dla pasmowych: krotka (dolna, górna))
+# Zwracane współczynniki (b, a) są tylko do odczytu, bo są współdzielone.
+# Statystyki trafień: designButterworth.cache_info()
+@lru_cache(maxsize=MAX_CACHED_DESIGNS)
+def designButterworth(order, cutoffFrequency, fs, btype='low'):
+    nyquistFrequency = 0.5 * fs
+    # Znormalizowana częstotliwość odcinana przez filter
+    if isinstance(cutoffFrequency, tuple):
+        normalizedCutoffFrequency = [f / nyquistFrequency for f in cutoffFrequency]
+    else:
+        normalizedCutoffFrequency = cutoffFrequency / nyquistFrequency
+    b, a = butter(order, normalizedCutoffFrequency, btype=btype, analog=False)
+    b.setflags(write=False)
+    a.setflags(write=False)
+    return b, a
+
+
+# Ten sam projekt w postaci sekcji drugiego rzędu (SOS) - numerycznie
+# stabilniejszej od (b, a) przy wyższych rzędach. Funkcje scipy (sosfilt)
+# wymagają tablicy zapisywalnej, więc przed użyciem robiona jest kopia.
+@lru_cache(maxsize=MAX_CACHED_DESIGNS)
+def designButterworthSOS(order, cutoffFrequency, fs, btype='low'):
+    nyquistFrequency = 0.5 * fs
+    if isinstance(cutoffFrequency, tuple):
+        normalizedCutoffFrequency = [f / nyquistFrequency for f in cutoffFrequency]
+    else:
+        normalizedCutoffFrequency = cutoffFrequency / nyquistFrequency
+    sos = butter(order, normalizedCutoffFrequency, btype=btype, analog=False, output='sos')
+    sos.setflags(write=False)
+    return sos
+
+
+# Liczba próbek, po której odpowiedź impulsowa filtru maleje poniżej tolerance
+# (na podstawie bieguna o największym module) - zakładka między blokami
+def settlingSamples(sos, tolerance=1e-12):
+    _, poles, _ = sos2zpk(sos)
+    radius = np.max(np.abs(poles)) if len(poles) else 0.0
+    if radius <= 0:
+        return 1
+    return int(np.ceil(np.log(tolerance) / np.log(radius)))
+
+
+# Filtr Butterwortha działający na kolejnych blokach sygnału (przyczynowo)
+# Projekt SOS wyznaczany jest raz, a stan filtru (zi) przenoszony między
+# blokami, więc wynik dla bloków jest taki sam jak dla całego sygnału naraz
+# (sosfilt), a każdy blok jest dostępny od razu po nadejściu.
+# Bloki mogą być jednokanałowe (n,) lub wielokanałowe (n, kanały).
+class StreamingButterworth:
+    def __init__(self, order, cutoffFrequency, fs, btype='low'):
+        self.sos = designButterworthSOS(order, cutoffFrequency, fs, btype).copy()
+        self.zi = None
+
+    def reset(self):
+        self.zi = None
+
+    def process(self, block):
+        block = np.asarray(block)
+        # Pusty blok - nic do filtrowania, stan filtru bez zmian
+        if block.shape[0] == 0:
+            return np.empty(block.shape, dtype=np.result_type(block.dtype, np.float64))
+        if self.zi is None:
+            # Stan początkowy jak dla sygnału stałego równego pierwszej próbce
+            zi = sosfilt_zi(self.sos)
+            self.zi = zi.reshape(zi.shape + (1,) * (block.ndim - 1)) * block[0]
+        filtered, self.zi = sosfilt(self.sos, block, axis=0, zi=self.zi)
+        return filtered
+
+
+# Liczba wątków: -1 oznacza wszystkie dostępne rdzenie, poza tym liczba dodatnia
+def threadCount(workers):
+    if workers == -1:
+        return os.cpu_count() or 1
+    if not isinstance(workers, (int, np.integer)) or workers < 1:
+        raise ValueError(f"Liczba wątków musi być dodatnia albo równa -1, a jest {workers}")
+    return int(workers)
+
+
+# Filtracja zero-fazowa (w przód i wstecz) odpowiadająca filtfilt
+# blockSize=None - cały sygnał jednym wywołaniem sosfiltfilt
+# blockSize=n    - sygnał dzielony na bloki po n próbek, każdy filtrowany
+#                  z zakładką halo próbek z obu stron (domyślnie czas zaniku
+#                  odpowiedzi impulsowej), więc wynik na stykach bloków jest
+#                  taki sam jak dla całego sygnału. Brzegi sygnału są
+#                  dopełniane jak w filtfilt (odbicie nieparzyste).
+# Bloki mogą pochodzić z np.memmap - w pamięci jest tylko blok z zakładką.
+# out  - tablica wynikowa (może to być samo data). Bez blockSize sosfiltfilt
+#        i tak tworzy tymczasowe tablice wielkości sygnału, więc out oszczędza
+#        tylko jedną alokację; szczyt pamięci ogranicza dopiero blockSize.
+#        Przy blokach wynik bloku zapisywany jest do out dopiero wtedy, gdy
+#        żaden następny blok (z zakładką) nie czyta już tych próbek z data.
+# data - tablica (n,) lub (n, kanały), filtrowana wzdłuż osi czasu (0)
+# workers=None - wszystkie kanały jednym wywołaniem sosfiltfilt
+# workers=k    - kanały rozdzielane między k wątków (-1 = wszystkie rdzenie);
+#                filtry scipy zwalniają GIL, więc kanały liczą się równolegle.
+# Wynik każdego kanału jest identyczny jak przy filtracji samego tego kanału.
+def zeroPhaseFilter(data, sos, blockSize=None, halo=None, out=None, workers=None):
+    sos = np.array(sos)
+    numberOfSamples = data.shape[0]
+    if out is None:
+        out = np.empty(data.shape, dtype=np.result_type(data.dtype, np.float64))
+    if workers is not None and data.ndim > 1 and data.shape[1] > 1:
+        def filterChannel(channel):
+            zeroPhaseFilter(data[:, channel], sos, blockSize, halo, out=out[:, channel])
+
+        with ThreadPoolExecutor(threadCount(workers)) as executor:
+            list(executor.map(filterChannel, range(data.shape[1])))
+        return out
+    if blockSize is None or blockSize >= numberOfSamples:
+        out[...] = sosfiltfilt(sos, data, axis=0)
+        return out
+
+    if halo is None:
+        halo = settlingSamples(sos)
+    pending = deque()
+    for start in range(0, numberOfSamples, blockSize):
+        stop = min(start + blockSize, numberOfSamples)
+        extendedStart = max(start - halo, 0)
+        extendedStop = min(stop + halo, numberOfSamples)
+        # Zapis gotowych bloków, których próbek nie obejmuje już zakładka bieżącego
+        while pending and pending[0][1] <= extendedStart:
+            writeStart, writeStop, filtered = pending.popleft()
+            out[writeStart:writeStop] = filtered
+        filtered = sosfiltfilt(sos, data[extendedStart:extendedStop], axis=0)
+        pending.append((start, stop, filtered[start - extendedStart:stop - extendedStart]))
+    for writeStart, writeStop, filtered in pending:
+        out[writeStart:writeStop] = filtered
+    return out
+
+
+# Filtr pasmowoprzepustowy ('bandpass') lub pasmowozaporowy ('bandstop')
+# Butterwortha rzędu order jako jedna kaskada SOS
+@lru_cache(maxsize=MAX_CACHED_DESIGNS)
+def designBandFilter(lowCutoff, highCutoff, fs, order=4, btype='bandpass'):
+    return designButterworthSOS(order, (lowCutoff, highCutoff), fs, btype)
+
+
+# Kaskada dolnoprzepustowego (highCutoff) i górnoprzepustowego (lowCutoff)
+# filtru Butterwortha złożona w jedną macierz SOS - ta sama charakterystyka
+# co dwa osobne filtry z Z4, ale sygnał przechodzi przez nią raz.
+# Wewnątrz sygnału wynik jest taki sam jak dwa kolejne filtfilt; na brzegach
+# różni się, bo dopełnienie brzegów i stan początkowy wyznaczane są raz dla
+# całej kaskady, a nie osobno dla każdego filtru (dla ekg_noise.txt z Z4:
+# ok. 250 próbek z każdej strony, różnica do ~1% amplitudy).
+@lru_cache(maxsize=MAX_CACHED_DESIGNS)
+def designLowHighCascade(lowCutoff, highCutoff, fs, order=4):
+    sos = np.vstack([designButterworthSOS(order, highCutoff, fs, 'low'),
+                     designButterworthSOS(order, lowCutoff, fs, 'high')])
+    sos.setflags(write=False)
+    return sos
+
+
+# Filtr wycinający (notch) wąskie pasmo wokół frequency, np. 50/60 Hz sieci
+# qualityFactor - dobroć filtru (szerokość pasma = frequency / qualityFactor)
+@lru_cache(maxsize=MAX_CACHED_DESIGNS)
+def designNotch(frequency, fs, qualityFactor=30.0):
+    b, a = iirnotch(frequency, qualityFactor, fs=fs)
+    sos = tf2sos(b, a)
+    sos.setflags(write=False)
+    return sos
+
+
+# Jednoprzebiegowa (zero-fazowa) filtracja pasmowa
+# design - 'butter' (projekt pasmowy Butterwortha) lub 'cascade' (kaskada
+#          dolno- i górnoprzepustowego, jak w Z4)
+# out    - tablica wynikowa; out=data zapisuje wynik w miejscu danych wejściowych
+#          (bez nowej tablicy na wynik - szczyt pamięci ogranicza blockSize,
+#          patrz zeroPhaseFilter)
+def bandFilter(data, lowCutoff, highCutoff, fs, order=4, btype='bandpass', design='butter',
+               blockSize=None, out=None, workers=None):
+    if design == 'cascade':
+        if btype != 'bandpass':
+            raise ValueError("Kaskada dolno- i górnoprzepustowa daje tylko filtr pasmowoprzepustowy")
+        sos = designLowHighCascade(lowCutoff, highCutoff, fs, order)
+    elif design == 'butter':
+        sos = designBandFilter(lowCutoff, highCutoff, fs, order, btype)
+    else:
+        raise ValueError(f"Nieznany projekt filtru: {design}")
+    return zeroPhaseFilter(data, sos, blockSize=blockSize, out=out, workers=workers)
+
+
+# Jednoprzebiegowa (zero-fazowa) filtracja wycinająca
+def notchFilter(data, frequency, fs, qualityFactor=30.0, blockSize=None, out=None, workers=None):
+    return zeroPhaseFilter(data, designNotch(frequency, fs, qualityFactor), blockSize=blockSize, out=out,
+                           workers=workers)
+
+
+# Filtracja kilku niezależnych nagrań (np. plików) tym samym filtrem
+# records - lista tablic (n,) lub (n, kanały), mogą mieć różne długości
+# workers - liczba wątków dla nagrań; wyniki w kolejności nagrań
+def filterRecords(records, sos, workers=None, **kwargs):
+    if workers is None:
+        return [zeroPhaseFilter(record, sos, **kwargs) for record in records]
+    with ThreadPoolExecutor(threadCount(workers)) as executor:
+        return list(executor.map(lambda record: zeroPhaseFilter(record, sos, **kwargs), records))
@@ -0,0 +1,213 @@
+import hashlib
+import itertools
+import os
+import struct
+import numpy as np
+
+# Domyślna liczba wierszy (próbek) wczytywanych w jednym bloku
+DEFAULT_CHUNK_SIZE = 65536
+
+
+# Wczytywanie sygnału z pliku tekstowego blokami po chunkSize próbek
+# Każdy blok jest parsowany w całości parserem C z np.loadtxt, bez tworzenia
+# listy liczb w Pythonie. W pamięci jest tylko bieżący blok.
+# Zwraca generator par (time, samples), gdzie samples ma kształt (n,) dla
+# sygnału jednokanałowego lub (n, kanały) dla wielokanałowego - jak loadSignal.
+def loadSignalChunks(filename, fs, chunkSize=DEFAULT_CHUNK_SIZE, dtype=np.float64):
+    offset = 0
+    with open(filename, "r") as file:
+        while True:
+            lines = list(itertools.islice(file, chunkSize))
+            if not lines:
+                break
+            samples = np.loadtxt(lines, dtype=dtype, ndmin=2)
+            if samples.shape[1] == 1:
+                samples = samples[:, 0]
+            time = (offset + np.arange(samples.shape[0])) / fs
+            offset += samples.shape[0]
+            yield time, samples
+
+
+# Wczytanie całego sygnału (złożenie bloków z loadSignalChunks)
+def readSignal(filename, fs, chunkSize=DEFAULT_CHUNK_SIZE):
+    chunks = list(loadSignalChunks(filename, fs, chunkSize))
+    if not chunks:
+        return np.zeros(0), np.zeros(0)
+    time = np.concatenate([chunk[0] for chunk in chunks])
+    signal = np.concatenate([chunk[1] for chunk in chunks])
+    return time, signal
+
+
+# Binarny format pamięci podręcznej sygnału (wszystkie pola little-endian):
+# nagłówek o stałym rozmiarze HEADER_SIZE, a po nim surowa tablica próbek
+# (próbka po próbce, kanały obok siebie) typu int16, float32 lub float64.
+# Nagłówek: znacznik, fs, liczba kanałów, typ danych, typ zamówiony przy
+# konwersji (np. "auto"), liczba próbek oraz czas modyfikacji, rozmiar i skrót
+# SHA-1 pliku tekstowego, z którego powstał plik binarny - na ich podstawie
+# pamięć podręczna jest unieważniana.
+CACHE_MAGIC = b"EKGBIN02"
+CACHE_EXTENSION = ".ekgbin"
+HEADER_FORMAT = "<8sdI4s4sQqQ20s"
+HEADER_SIZE = 128
+CACHE_DTYPES = {"i2": np.dtype("<i2"), "f4": np.dtype("<f4"), "f8": np.dtype("<f8")}
+# Domyślnie próbki zapisywane są bez zmiany typu (float64, jak z np.loadtxt);
+# "auto" (int16 dla próbek całkowitych, w przeciwnym razie float32) oraz
+# "i2"/"f4" zmniejszają plik, ale zmieniają typ wczytanych danych
+DEFAULT_CACHE_DTYPE = "f8"
+
+
+# Ścieżka pliku binarnego: obok pliku źródłowego albo w katalogu cacheDir
+def cachePath(filename, cacheDir=None):
+    path = os.path.splitext(filename)[0] + CACHE_EXTENSION
+    if cacheDir is None:
+        return path
+    os.makedirs(cacheDir, exist_ok=True)
+    return os.path.join(cacheDir, os.path.basename(path))
+
+
+def fileHash(filename, blockSize=1 << 20):
+    digest = hashlib.sha1()
+    with open(filename, "rb") as file:
+        for block in iter(lambda: file.read(blockSize), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def writeHeader(file, fs, numberOfChannels, dtypeCode, requestedDtype, numberOfSamples, sourceStat, sourceHash):
+    header = struct.pack(HEADER_FORMAT, CACHE_MAGIC, fs, numberOfChannels, dtypeCode.encode().ljust(4),
+                         requestedDtype.encode().ljust(4), numberOfSamples, sourceStat.st_mtime_ns,
+                         sourceStat.st_size, sourceHash)
+    file.seek(0)
+    file.write(header.ljust(HEADER_SIZE, b"\0"))
+
+
+def readHeader(path):
+    with open(path, "rb") as file:
+        raw = file.read(struct.calcsize(HEADER_FORMAT))
+    if len(raw) < struct.calcsize(HEADER_FORMAT):
+        return None
+    magic, fs, numberOfChannels, dtypeCode, requestedDtype, numberOfSamples, mtime, size, sourceHash = \
+        struct.unpack(HEADER_FORMAT, raw)
+    if magic != CACHE_MAGIC:
+        return None
+    return {"fs": fs, "channels": numberOfChannels, "dtype": dtypeCode.decode().strip(),
+            "requested": requestedDtype.decode().strip(), "samples": numberOfSamples,
+            "mtime": mtime, "size": size, "hash": sourceHash}
+
+
+# Jednorazowa konwersja pliku tekstowego do formatu binarnego
+# dtype    - "f8" (bez zmiany typu), "i2", "f4" lub "auto": int16, jeśli wszystkie
+#            próbki są liczbami całkowitymi z zakresu int16, w przeciwnym razie float32
+# cacheDir - katalog pliku binarnego (None - obok pliku źródłowego)
+# Plik jest przetwarzany blokami (loadSignalChunks), więc pamięć nie rośnie
+# z długością nagrania.
+def convertToBinary(filename, fs, dtype=DEFAULT_CACHE_DTYPE, chunkSize=DEFAULT_CHUNK_SIZE, cacheDir=None):
+    path = cachePath(filename, cacheDir)
+    sourceStat = os.stat(filename)
+    sourceHash = fileHash(filename)
+    automatic = dtype == "auto"
+    int16Range = np.iinfo(np.int16)
+
+    # Przy "auto" najpierw int16; próbki niecałkowite - plik zapisywany od nowa jako float32
+    for dtypeCode in ("i2", "f4") if automatic else (dtype,):
+        with open(path, "wb") as file:
+            file.seek(HEADER_SIZE)
+            numberOfSamples = 0
+            numberOfChannels = 1
+            for _, samples in loadSignalChunks(filename, fs, chunkSize):
+                if dtypeCode == "i2" and automatic and not (np.all(samples == np.round(samples))
+                                                            and samples.min() >= int16Range.min
+                                                            and samples.max() <= int16Range.max):
+                    break
+                numberOfChannels = 1 if samples.ndim == 1 else samples.shape[1]
+                file.write(samples.astype(CACHE_DTYPES[dtypeCode]).tobytes())
+                numberOfSamples += samples.shape[0]
+            else:
+                writeHeader(file, fs, numberOfChannels, dtypeCode, dtype, numberOfSamples, sourceStat, sourceHash)
+                return path
+
+
+# Sprawdzenie, czy plik binarny odpowiada aktualnej wersji pliku tekstowego
+# Zgodny rozmiar i czas modyfikacji wystarczają; przy innym czasie modyfikacji
+# (np. po skopiowaniu pliku) porównywany jest skrót SHA-1 zawartości.
+def isCacheValid(filename, fs, header):
+    if header is None or header["fs"] != fs:
+        return False
+    sourceStat = os.stat(filename)
+    if header["size"] != sourceStat.st_size:
+        return False
+    if header["mtime"] == sourceStat.st_mtime_ns:
+        return True
+    return header["hash"] == fileHash(filename)
+
+
+# Otwarcie sygnału przez np.memmap - przy pierwszym użyciu (lub po zmianie
+# pliku tekstowego) tworzony jest plik binarny obok pliku źródłowego
+# (albo w katalogu cacheDir). Odczyt wycinka sygnału dotyka tylko
+# potrzebnych stron pliku.
+# dtype - typ próbek w pliku binarnym (patrz convertToBinary); domyślnie
+#         float64, jak przy wczytaniu pliku tekstowego
+# Plik binarny zapisany dla innego dtype (także "auto" a jawny typ) jest tworzony od nowa.
+# Zwraca (time, signal) jak loadSignal; time to zwykła tablica np.arange(n) / fs,
+# signal jest tylko do odczytu.
+def loadSignalCached(filename, fs, dtype=DEFAULT_CACHE_DTYPE, cacheDir=None):
+    path = cachePath(filename, cacheDir)
+    header = readHeader(path) if os.path.exists(path) else None
+    if not isCacheValid(filename, fs, header) or header["requested"] != dtype:
+        convertToBinary(filename, fs, dtype, cacheDir=cacheDir)
+        header = readHeader(path)
+    elif header["mtime"] != os.stat(filename).st_mtime_ns:
+        # Ta sama zawartość, nowy czas modyfikacji - zapamiętanie go w nagłówku,
+        # żeby kolejne otwarcia nie liczyły skrótu od nowa
+        with open(path, "r+b") as file:
+            writeHeader(file, fs, header["channels"], header["dtype"], header["requested"], header["samples"],
+                        os.stat(filename), header["hash"])
+
+    shape = (header["samples"],) if header["channels"] == 1 else (header["samples"], header["channels"])
+    if header["samples"] == 0:
+        signal = np.zeros(shape, dtype=CACHE_DTYPES[header["dtype"]])
+    else:
+        signal = np.memmap(path, dtype=CACHE_DTYPES[header["dtype"]], mode="r", offset=HEADER_SIZE, shape=shape)
+    return np.arange(header["samples"]) / fs, signal
+
+
+# Wycinek (slice) osi czasu time dla zakresu [signalStart, signalEnd]
+# time musi być próbkowany równomiernie (jak w loadSignal); wynik jest
+# identyczny z maską (time >= signalStart) & (time <= signalEnd)
+def segmentSlice(time, signalStart, signalEnd):
+    numberOfSamples = len(time)
+    # Jedna próbka lub stała oś czasu (brak kroku próbkowania) - zwykła maska
+    if numberOfSamples < 2 or time[-1] == time[0]:
+        time = np.asarray(time)
+        mask = (time >= signalStart) & (time <= signalEnd)
+        indices = np.flatnonzero(mask)
+        return slice(int(indices[0]), int(indices[-1]) + 1) if len(indices) else slice(0, 0)
+
+    samplesPerSecond = (numberOfSamples - 1) / (time[-1] - time[0])
+
+    def sampleTime(index):
+        return time[index]
+
+    start = boundaryIndex(numberOfSamples, sampleTime, (signalStart - time[0]) * samplesPerSecond,
+                          lambda t: t >= signalStart)
+    stop = boundaryIndex(numberOfSamples, sampleTime, (signalEnd - time[0]) * samplesPerSecond,
+                         lambda t: t > signalEnd)
+    return slice(start, max(start, stop))
+
+
+# Pierwszy indeks i, dla którego warunek condition(sampleTime(i)) jest spełniony
+# (warunek monotoniczny względem i), szukany od przybliżenia estimate
+def boundaryIndex(numberOfSamples, sampleTime, estimate, condition):
+    index = int(min(max(np.ceil(estimate), 0), numberOfSamples))
+    while index > 0 and condition(sampleTime(index - 1)):
+        index -= 1
+    while index < numberOfSamples and not condition(sampleTime(index)):
+        index += 1
+    return index
+
+
+# Wycinek sygnału (jedno- lub wielokanałowego) bez kopiowania danych
+# Zwraca widoki (time[start:stop], signal[start:stop])
+def signalSegment(time, signal, signalStart, signalEnd):
+    segment = segmentSlice(time, signalStart, signalEnd)
+    return time[segment], signal[segment]
@@ -0,0 +1,69 @@
+import numpy as np
+from ekg_io import segmentSlice
+
+
+# Obwiednia min/max sygnału do rysowania: próbki dzielone są na numberOfColumns
+# przedziałów (po jednym na kolumnę pikseli wykresu), a z każdego przedziału
+# zostaje minimum i maksimum. Linia przechodzi przez oba punkty, więc wąskie
+# szczyty (np. zespoły QRS) są widoczne tak samo jak przy pełnym sygnale.
+# signal - tablica (n,) lub (n, kanały); zwraca (time, signal) z 2 * numberOfColumns próbkami
+def minMaxEnvelope(time, signal, numberOfColumns):
+    numberOfSamples = len(time)
+    if numberOfSamples <= 2 * numberOfColumns:
+        return time, signal
+
+    # Początki przedziałów - np.minimum.reduceat liczy min w każdym z nich
+    starts = np.linspace(0, numberOfSamples, numberOfColumns, endpoint=False).astype(np.intp)
+    minimum = np.minimum.reduceat(signal, starts, axis=0)
+    maximum = np.maximum.reduceat(signal, starts, axis=0)
+
+    envelopeTime = np.repeat(time[starts], 2)
+    envelope = np.empty((2 * numberOfColumns,) + signal.shape[1:], dtype=signal.dtype)
+    envelope[0::2] = minimum
+    envelope[1::2] = maximum
+    return envelopeTime, envelope
+
+
+# Linia wykresu rysowana z obwiedni min/max dopasowanej do szerokości osi
+# Obwiednia jest liczona od nowa tylko wtedy, gdy zmieni się widoczny zakres
+# czasu (np. po przybliżeniu) lub szerokość osi (zmiana rozmiaru okna) - koszt rysowania zależy od
+# rozdzielczości ekranu, a nie od długości nagrania.
+# Matplotlib trzyma metody podpięte przez callbacks.connect/mpl_connect tylko jako
+# słabe referencje, dlatego obiekt jest zapamiętywany na swojej linii (line.envelope) -
+# żyje tak długo jak wykres, nawet gdy wywołujący nie zachowa EnvelopeLine.
+class EnvelopeLine:
+    def __init__(self, ax, time, signal, **plotKwargs):
+        self.ax = ax
+        self.time = time
+        self.signal = signal
+        self.window = None
+        (self.line,) = ax.plot([], [], **plotKwargs)
+        self.line.envelope = self
+        # Pusty wycinek - linia bez danych, nie ma czego przeliczać
+        if len(time) == 0:
+            return
+        self.update(time[0], time[-1])
+        ax.relim()
+        ax.autoscale_view()
+        ax.callbacks.connect("xlim_changed", self.onXlimChanged)
+        ax.figure.canvas.mpl_connect("resize_event", self.onResize)
+
+    def numberOfColumns(self):
+        return max(1, int(self.ax.get_window_extent().width))
+
+    def update(self, signalStart, signalEnd):
+        window = (signalStart, signalEnd, self.numberOfColumns())
+        if window == self.window:
+            return
+        self.window = window
+        segment = segmentSlice(self.time, signalStart, signalEnd)
+        # Jedna próbka z każdej strony zakresu, żeby linia dochodziła do krawędzi osi
+        segment = slice(max(segment.start - 1, 0), min(segment.stop + 1, len(self.time)))
+        self.line.set_data(*minMaxEnvelope(self.time[segment], self.signal[segment], window[2]))
+
+    def onXlimChanged(self, ax):
+        self.update(*ax.get_xlim())
+
+    # Zmiana rozmiaru okna zmienia szerokość osi w pikselach (liczbę przedziałów)
+    def onResize(self, event):
+        self.update(*self.ax.get_xlim())
@@ -0,0 +1,146 @@
+from collections import deque
+from functools import lru_cache
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.fft import irfft, next_fast_len, rfft, rfftfreq
+from scipy.signal import get_window
+
+# Widmo sygnałów rzeczywistych liczone transformatą rfft
+# Dla sygnału rzeczywistego widmo jest symetryczne, więc rfft liczy tylko
+# połowę dodatnią (N // 2 + 1 prążków) - mniej więcej o połowę mniej obliczeń
+# i pamięci niż pełne fft, z którego i tak zostawiana była połowa [:N // 2].
+
+
+# Oś częstotliwości dla N próbek i częstotliwości próbkowania fs (zapamiętywana)
+@lru_cache(maxsize=64)
+def frequencyAxis(numberOfSamples, fs):
+    frequencies = rfftfreq(numberOfSamples, 1 / fs)
+    frequencies.setflags(write=False)
+    return frequencies
+
+
+# Długość transformaty: nfft (domyślnie długość sygnału), a przy fastLength=True
+# najbliższa nie mniejsza długość, dla której FFT jest szybkie (dopełnienie zerami)
+def transformLength(numberOfSamples, nfft=None, fastLength=False):
+    length = nfft or numberOfSamples
+    return next_fast_len(length, real=True) if fastLength else length
+
+
+# Transformata Fouriera sygnału rzeczywistego
+# signal - tablica (n,) lub (n, kanały); wszystkie kanały liczone jednym wywołaniem
+# workers - liczba wątków scipy.fft (np. -1 = wszystkie rdzenie)
+# Zwraca (frequencies, X), gdzie X ma kształt (nfft // 2 + 1,) lub (nfft // 2 + 1, kanały)
+def realSpectrum(signal, fs, nfft=None, fastLength=False, axis=0, workers=None):
+    length = transformLength(signal.shape[axis], nfft, fastLength)
+    return frequencyAxis(length, fs), rfft(signal, n=length, axis=axis, workers=workers)
+
+
+# Widmo amplitudowe |X| (normalize=True - podzielone przez liczbę próbek sygnału)
+def amplitudeSpectrum(signal, fs, nfft=None, fastLength=False, normalize=False, axis=0, workers=None):
+    frequencies, X = realSpectrum(signal, fs, nfft, fastLength, axis, workers)
+    magnitude = np.abs(X)
+    if normalize:
+        magnitude /= signal.shape[axis]
+    return frequencies, magnitude
+
+
+# Odwrotna transformata - numberOfSamples to długość sygnału przed transformatą
+# (X musi pochodzić z realSpectrum bez dopełnienia zerami)
+def inverseRealSpectrum(X, numberOfSamples, axis=0, workers=None):
+    return irfft(X, n=numberOfSamples, axis=axis, workers=workers)
+
+
+# Strumieniowy estymator widma (Welch) i spektrogram (STFT)
+# Sygnał podawany jest blokami dowolnej długości (update), np. z generatora
+# ekg_io.loadSignalChunks. Estymator przechowuje tylko niepełny ostatni
+# segment oraz sumy widm, więc pamięć nie zależy od długości nagrania.
+# Segmenty mają długość segmentLength i nakładają się o overlap próbek
+# (domyślnie połowa), każdy jest mnożony przez okno (domyślnie Hann).
+# Sygnał może być jednokanałowy (n,) lub wielokanałowy (n, kanały).
+# maxFrames - liczba ostatnich ramek STFT przechowywanych dla spektrogramu
+#             (ramka to segmentLength // 2 + 1 prążków float64 na kanał, np.
+#             ok. 200 kB dla 12 kanałów i segmentów 4096 próbek; 0 - bez spektrogramu)
+class StreamingSpectrum:
+    def __init__(self, fs, segmentLength=1024, overlap=None, window="hann", maxFrames=64):
+        if segmentLength < 1:
+            raise ValueError(f"Długość segmentu musi być dodatnia, a jest {segmentLength}")
+        overlap = segmentLength // 2 if overlap is None else overlap
+        if not 0 <= overlap < segmentLength:
+            raise ValueError(f"Zakładka musi spełniać 0 <= overlap < segmentLength ({segmentLength}), a jest {overlap}")
+        self.fs = fs
+        self.segmentLength = segmentLength
+        self.step = segmentLength - overlap
+        self.window = get_window(window, segmentLength)
+        self.frequencies = frequencyAxis(segmentLength, fs)
+        self.buffer = None
+        self.consumed = 0
+        self.numberOfSegments = 0
+        self.powerSum = 0
+        self.magnitudeSum = 0
+        self.frames = deque(maxlen=maxFrames)
+        self.frameTimes = deque(maxlen=maxFrames)
+
+    # Dodanie kolejnego bloku próbek (wzdłuż osi 0)
+    def update(self, block):
+        block = np.asarray(block, dtype=np.float64)
+        self.buffer = block if self.buffer is None else np.concatenate([self.buffer, block])
+        available = self.buffer.shape[0]
+        if available < self.segmentLength:
+            return
+
+        # Wszystkie pełne segmenty w buforze - jedna transformata dla wszystkich
+        count = (available - self.segmentLength) // self.step + 1
+        segments = sliding_window_view(self.buffer, self.segmentLength, axis=0)[::self.step][:count]
+        window = self.window.reshape((1,) * (segments.ndim - 1) + (-1,))
+        X = rfft(segments * window, axis=-1)
+        X = np.moveaxis(X, -1, 1)  # (segmenty, częstotliwości[, kanały])
+        power = np.abs(X) ** 2
+
+        self.powerSum = self.powerSum + power.sum(axis=0)
+        self.magnitudeSum = self.magnitudeSum + np.sqrt(power).sum(axis=0)
+        self.numberOfSegments += count
+        starts = self.consumed + np.arange(count) * self.step
+        self.frames.extend(power)
+        self.frameTimes.extend((starts + self.segmentLength / 2) / self.fs)
+
+        # W buforze zostaje tylko początek następnego (niepełnego) segmentu
+        self.consumed += count * self.step
+        self.buffer = self.buffer[count * self.step:].copy()
+
+    # Przetworzenie wszystkich bloków z generatora (np. par (time, samples))
+    def feed(self, chunks):
+        for chunk in chunks:
+            self.update(chunk[1] if isinstance(chunk, tuple) else chunk)
+        return self
+
+    # Mnożnik widma jednostronnego: prążki poza 0 Hz i Nyquistem liczone podwójnie
+    def oneSidedFactor(self):
+        factor = np.full(len(self.frequencies), 2.0)
+        factor[0] = 1.0
+        if self.segmentLength % 2 == 0:
+            factor[-1] = 1.0
+        return factor.reshape((-1,) + (1,) * (np.ndim(self.powerSum) - 1))
+
+    def densityScale(self):
+        return self.oneSidedFactor() / (self.fs * np.sum(self.window ** 2))
+
+    # Gęstość widmowa mocy metodą Welcha (jak scipy.signal.welch z detrend=False)
+    def psd(self):
+        return self.frequencies, self.powerSum / max(self.numberOfSegments, 1) * self.densityScale()
+
+    # Uśrednione (Welch) i znormalizowane widmo amplitudowe - sinusoida
+    # o amplitudzie A daje prążek ~A, niezależnie od długości segmentu i nagrania.
+    # To nie jest |X| rysowane w Z3/Z4 (amplitudeSpectrum z normalize=False),
+    # gdzie ta sama sinusoida daje prążek ~A * N / 2 dla N próbek sygnału.
+    def amplitudeSpectrum(self):
+        magnitude = self.magnitudeSum / max(self.numberOfSegments, 1)
+        return self.frequencies, magnitude * self.oneSidedFactor() / np.sum(self.window)
+
+    # Spektrogram z ostatnich maxFrames segmentów (jak scipy.signal.spectrogram, mode='psd')
+    # Zwraca (frequencies, times, Sxx), Sxx ma kształt (częstotliwości, [kanały,] ramki)
+    def spectrogram(self):
+        if not self.frames:
+            return self.frequencies, np.zeros(0), np.zeros((len(self.frequencies), 0))
+        frames = np.stack(self.frames, axis=-1)
+        scale = self.densityScale().reshape(frames.shape[:-1][:1] + (1,) * (frames.ndim - 1))
+        return self.frequencies, np.array(self.frameTimes), frames * scale
@@ -1,9 +1,10 @@
 import numpy as np
 from PIL import Image
-import matplotlib
-matplotlib.use('TkAgg')
-import matplotlib.pyplot as plt
+from scipy.signal import fftconvolve
+from rendering import get_renderer, select_backend
+select_backend()  # TkAgg przy dostępnym ekranie, w przeciwnym razie Agg
 import os
+from kernel_cache import cached_kernel
 
 def apply_average_filter(image, kernel_size):
     pad = kernel_size // 2
@@ -15,6 +16,7 @@ def apply_average_filter(image, kernel_size):
             filtered[i, j] = np.mean(window)
     return filtered.astype(np.uint8)
 
+@cached_kernel
 def gaussian_kernel(kernel_size, sigma=1.0):
     ax = np.linspace(-(kernel_size-1)/2, (kernel_size-1)/2, kernel_size)
     xx, yy = np.meshgrid(ax, ax)
@@ -22,51 +24,97 @@ def gaussian_kernel(kernel_size, sigma=1.0):
     kernel /= np.sum(kernel)
     return kernel
 
-def apply_gaussian_filter(image, kernel_size, sigma=1.0):
-    kernel = gaussian_kernel(kernel_size, sigma)
-    pad = kernel_size // 2
-    padded = np.pad(image, pad, mode='reflect')
-    filtered = np.zeros_like(image, dtype=np.float32)
-    for i in range(image.shape[0]):
-        for j in range(image.shape[1]):
+# Jednowymiarowy odpowiednik gaussian_kernel - jądro 2-D to iloczyn zewnętrzny
+# dwóch takich wektorów, więc filtrację można wykonać dwoma przebiegami 1-D
+@cached_kernel
+def gaussian_kernel_1d(kernel_size, sigma=1.0):
+    ax = np.linspace(-(kernel_size-1)/2, (kernel_size-1)/2, kernel_size)
+    kernel = np.exp(-ax**2 / (2. * sigma**2))
+    kernel /= np.sum(kernel)
+    return kernel
+
+# Przybliżony koszt FFT na piksel w jednostkach mnożeń filtru separowalnego
+# (dobrany pomiarowo); FFT wybierane jest, gdy 2*k przekracza ten koszt
+FFT_COST_FACTOR = 2.0
+
+# Wybór metody na podstawie rozmiaru jądra i obrazu:
+# separowalny splot kosztuje ~2k mnożeń na piksel, FFT ~log2 liczby pikseli
+def choose_gaussian_method(kernel_size, image_shape):
+    padded_pixels = (image_shape[0] + kernel_size - 1) * (image_shape[1] + kernel_size - 1)
+    if 2 * kernel_size > FFT_COST_FACTOR * np.log2(padded_pixels):
+        return 'fft'
+    return 'separable'
+
+# Wersja referencyjna - iloczyn okna i jądra 2-D liczony dla każdego piksela
+def gaussian_filter_loop(padded, kernel, shape):
+    kernel_size = kernel.shape[0]
+    filtered = np.zeros(shape, dtype=np.float32)
+    for i in range(shape[0]):
+        for j in range(shape[1]):
             window = padded[i:i+kernel_size, j:j+kernel_size]
             filtered[i, j] = np.sum(window * kernel)
+    return filtered
+
+# Dwa przebiegi 1-D (kolumny, potem wiersze) - k mnożeń na piksel w każdym
+def gaussian_filter_separable(padded, kernel_1d, shape):
+    height, width = shape
+    padded = padded.astype(np.float64)
+    columns = np.zeros((height, padded.shape[1]))
+    for offset, weight in enumerate(kernel_1d):
+        columns += weight * padded[offset:offset+height]
+    filtered = np.zeros(shape)
+    for offset, weight in enumerate(kernel_1d):
+        filtered += weight * columns[:, offset:offset+width]
+    return filtered.astype(np.float32)
+
+# Splot przez FFT - koszt niezależny od rozmiaru jądra
+# (jądro jest symetryczne, więc splot jest równy korelacji z pętli)
+def gaussian_filter_fft(padded, kernel, shape):
+    return fftconvolve(padded.astype(np.float64), kernel, mode='valid').astype(np.float32)
+
+# method - 'auto' (wybór wg choose_gaussian_method), 'separable', 'fft' lub 'loop'
+def apply_gaussian_filter(image, kernel_size, sigma=1.0, method='auto'):
+    if method == 'auto':
+        method = choose_gaussian_method(kernel_size, image.shape)
+    pad = kernel_size // 2
+    padded = np.pad(image, pad, mode='reflect')
+    if method == 'separable':
+        filtered = gaussian_filter_separable(padded, gaussian_kernel_1d(kernel_size, sigma), image.shape)
+    elif method == 'fft':
+        filtered = gaussian_filter_fft(padded, gaussian_kernel(kernel_size, sigma), image.shape)
+    elif method == 'loop':
+        filtered = gaussian_filter_loop(padded, gaussian_kernel(kernel_size, sigma), image.shape)
+    else:
+        raise ValueError(f"Nieznana metoda: {method}")
     return filtered.astype(np.uint8)
 
 def plot_and_save_grid(image, kernel_sizes, sigmas, image_name, output_dir):
     rows = len(kernel_sizes)
     cols = 2 + len(sigmas)  # Oryginał + filtr średni + filtry Gaussa dla każdej sigma
 
-    plt.figure(figsize=(4*cols, 4*rows))
-
-    for row_idx, ksize in enumerate(kernel_sizes):
-        avg_filtered = apply_average_filter(image, ksize)
-        # Kolumna 0: oryginał (tylko w pierwszym wierszu, żeby nie dublować)
-        plt.subplot(rows, cols, row_idx*cols + 1)
-        plt.imshow(image, cmap='gray')
-        if row_idx == 0:
-            plt.title('Oryginał')
-        plt.axis('off')
-
-        # Kolumna 1: filtr uśredniający
-        plt.subplot(rows, cols, row_idx*cols + 2)
-        plt.imshow(avg_filtered, cmap='gray')
-        plt.title(f'Uśredniający {ksize}x{ksize}')
-        plt.axis('off')
-
-        # Kolumny 2+: filtry Gaussa dla każdego sigma
-        for col_idx, sigma in enumerate(sigmas):
-            gauss_filtered = apply_gaussian_filter(image, ksize, sigma)
-            plt.subplot(rows, cols, row_idx*cols + 3 + col_idx)
-            plt.imshow(gauss_filtered, cmap='gray')
+    # Najpierw wszystkie filtry (wiersz: oryginał, uśredniający, Gauss dla każdego sigma),
+    # potem rysowanie siatki, które może odbyć się w tle
+    grid = [[image, apply_average_filter(image, ksize)]
+            + [apply_gaussian_filter(image, ksize, sigma) for sigma in sigmas]
+            for ksize in kernel_sizes]
+
+    def draw(fig, axes):
+        axes = np.reshape(axes, (rows, cols))
+        for row_idx, (ksize, row) in enumerate(zip(kernel_sizes, grid)):
+            for ax, filtered in zip(axes[row_idx], row):
+                ax.imshow(filtered, cmap='gray')
+                ax.axis('off')
+            # Kolumna 0: oryginał (tytuł tylko w pierwszym wierszu, żeby nie dublować)
+            # Kolumna 1: filtr uśredniający, kolumny 2+: filtry Gaussa dla każdego sigma
+            axes[row_idx, 1].set_title(f'Uśredniający {ksize}x{ksize}')
             if row_idx == 0:
-                plt.title(f'Gauss σ={sigma}')
-            plt.axis('off')
+                axes[0, 0].set_title('Oryginał')
+                for ax, sigma in zip(axes[0, 2:], sigmas):
+                    ax.set_title(f'Gauss σ={sigma}')
+        fig.tight_layout()
 
-    plt.tight_layout()
     filename = f"{image_name}_comparison_grid.png"
-    plt.savefig(os.path.join(output_dir, filename))
-    plt.close()
+    get_renderer().render(draw, os.path.join(output_dir, filename), rows, cols, figsize=(4*cols, 4*rows))
 
 def process_images_grid(input_dir, output_dir, kernel_sizes, sigmas, image_files):
     os.makedirs(output_dir, exist_ok=True)
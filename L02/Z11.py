@@ -1,19 +1,20 @@
 import os
 import numpy as np
 from PIL import Image
-import matplotlib
-matplotlib.use('TkAgg')  # Ustawienie backendu Matplotlib na TkAgg dla GUI
-import matplotlib.pyplot as plt
-from scipy.ndimage import convolve, gaussian_filter  # Funkcje do konwolucji i filtru Gaussa
+from rendering import get_renderer, select_backend
+select_backend()  # TkAgg przy dostępnym ekranie, w przeciwnym razie Agg
+from kernel_cache import cached_kernel  # Wspólna pamięć podręczna masek filtrów
+from sharpening import SHARPENING  # Wyostrzanie w float32 na wspólnych buforach
+from gradients import sobel_gradients, to_uint8  # Gradient Sobela bez pełnych splotów 3x3
 
 INPUT_DIR = "./Images"                # Katalog z obrazami wejściowymi
 OUTPUT_DIR = "./Images-converted-Z11"  # Katalog na wyniki
 os.makedirs(OUTPUT_DIR, exist_ok=True)  # Utwórz katalog, jeśli nie istnieje
 
 
-# --- Filtr Sobela w różnych kierunkach ---
-def sobel_edges(image):
-    # Definicja masek Sobela: poziomy, pionowy i dwa ukośne
+# --- Maski Sobela: poziomy, pionowy i dwa ukośne ---
+@cached_kernel
+def sobel_kernels():
     sobel_h = np.array([[ 1,  2,  1],
                         [ 0,  0,  0],
                         [-1, -2, -1]])
@@ -26,41 +27,51 @@ def sobel_edges(image):
     sobel_d2 = np.array([[ 0,  -1, -2],
                          [ 1,  0, -1],
                          [ 2,  1, 0]])
+    return sobel_h, sobel_v, sobel_d1, sobel_d2
 
-    # Nakładanie masek konwolucją oraz pobieranie wartości bezwzględnej
-    results = {
-        'Sobel poziomy': np.abs(convolve(image, sobel_h)),
-        'Sobel pionowy': np.abs(convolve(image, sobel_v)),
-        'Sobel ukośny 1': np.abs(convolve(image, sobel_d1)),
-        'Sobel ukośny 2': np.abs(convolve(image, sobel_d2))
-    }
-    # Ograniczenie wyników do zakresu [0, 255] i konwersja na uint8
-    return {k: np.clip(v, 0, 255).astype(np.uint8) for k, v in results.items()}
+
+# --- Maska Laplace'a wykrywająca krawędzie ---
+@cached_kernel
+def laplacian_kernel():
+    return np.array([[0, -1, 0],
+                     [-1, 4, -1],
+                     [0, -1, 0]])
+
+
+# --- Filtr Sobela w różnych kierunkach ---
+# Maski Sobela z sobel_kernels() liczone wspólnie (patrz gradients.py):
+# poziomy i pionowy gradient raz, ukośne wyznaczane z nich. Obliczenia
+# w int16 - dawniej splot obrazu uint8 dawał wynik uint8 zawinięty modulo 256.
+SOBEL_LABELS = {
+    'horizontal': 'Sobel poziomy',
+    'vertical': 'Sobel pionowy',
+    'diagonal1': 'Sobel ukośny 1',
+    'diagonal2': 'Sobel ukośny 2'
+}
+
+
+def sobel_edges(image):
+    gradients = sobel_gradients(image, outputs=tuple(SOBEL_LABELS))
+    # Wartość bezwzględna ograniczona do zakresu [0, 255] i konwersja na uint8
+    return {SOBEL_LABELS[name]: to_uint8(response) for name, response in gradients.items()}
 
 
 # --- Wyostrzanie obrazu przez filtr Laplace'a ---
 def laplacian_sharpen(image):
     # Maska Laplace'a wykrywająca krawędzie
-    kernel = np.array([[0, -1, 0],
-                       [-1, 4, -1],
-                       [0, -1, 0]])
+    kernel = laplacian_kernel()
 
-    lap = convolve(image, kernel)     # Wyznaczamy krawędzie (Laplasjan)
-    sharp = image + lap               # Odejmujemy Laplasjan od oryginału -> wyostrzanie
-    return np.clip(sharp, 0, 255).astype(np.uint8)  # Ograniczamy zakres i konwertujemy
+    # Laplasjan i suma z oryginałem liczone w float32 (bez przepełnienia uint8)
+    return SHARPENING.laplacian(image, kernel)
 
 
 
 # --- Unsharp mask i High Boost Filtering ---
 def unsharp_mask(image, sigma=1.0, k=1.0):
-    # Najpierw rozmywamy obraz filtrem Gaussa
-    blurred = gaussian_filter(image, sigma=sigma)
-    # Maskę tworzymy jako różnicę oryginału i rozmycia
-    mask = image - blurred
-    # Dodajemy skalowaną maskę do oryginału
-    result = image + k * mask
-    # Ograniczamy wynik do [0, 255]
-    return np.clip(result, 0, 255).astype(np.uint8)
+    # Rozmycie Gaussa, maska (oryginał - rozmycie) i dodanie k * maski
+    # w float32 na buforach wielokrotnego użytku (patrz sharpening.py);
+    # wynik ograniczony do [0, 255]
+    return SHARPENING.unsharp(image, sigma=sigma, k=k)
 
 
 # --- Funkcje przetwarzające obrazy dla konkretnych zadań ---
@@ -91,27 +102,25 @@ def process_unsharp(path):
 
 # --- Funkcja do wyświetlania i zapisywania wyników ---
 def plot_results(results, title, image_name):
-    plt.figure(figsize=(15, 5))
-    # Tworzymy subploty dla każdego obrazu w słowniku results
-    for i, (label, img) in enumerate(results.items(), 1):
-        plt.subplot(1, len(results), i)
-        plt.imshow(img, cmap='gray')
-        plt.title(label)
-        plt.axis('off')
-
-        # Zapisujemy każdy obraz osobno poza oryginałem
+    # Zapisujemy każdy obraz osobno poza oryginałem
+    for label, img in results.items():
         if label != 'Oryginał':
             fname = f"{image_name}_{label.replace(' ', '_')}.tif"
             Image.fromarray(img).save(os.path.join(OUTPUT_DIR, fname))
 
-    plt.suptitle(title)
-    plt.tight_layout()
+    # Tworzymy subploty dla każdego obrazu w słowniku results
+    def draw(fig, axes):
+        for ax, (label, img) in zip(np.ravel(axes), results.items()):
+            ax.imshow(img, cmap='gray')
+            ax.set_title(label)
+            ax.axis('off')
+
+        fig.suptitle(title)
+        fig.tight_layout()
 
     # Zapis całej figury (widocznego układu podwykresów) jako PNG
     fig_filename = f"{image_name}_comparison_grid.png"
-    plt.savefig(os.path.join(OUTPUT_DIR, fig_filename), dpi=300)
-
-    plt.show()
+    get_renderer().render(draw, os.path.join(OUTPUT_DIR, fig_filename), 1, len(results), figsize=(15, 5), dpi=300)
 
 
 
@@ -1,10 +1,13 @@
 import os
 import numpy as np
 from PIL import Image
-import matplotlib
-matplotlib.use('TkAgg')  # Ustawienie backendu Matplotlib na TkAgg do wyświetlania GUI
-import matplotlib.pyplot as plt
+from rendering import get_renderer, select_backend
+select_backend()  # TkAgg przy dostępnym ekranie, w przeciwnym razie Agg
 from scipy.ndimage import gaussian_filter, median_filter  # Import filtrów: Gaussa i medianowego
+from histograms import min_max
+from pipeline import Pipeline
+from sharpening import SHARPENING
+from tiled import TILE_SIZE, gaussian_radius, open_source, process_tiled, tiled_min_max, window_radius
 
 # Ścieżki do katalogów wejściowego i wyjściowego
 INPUT_DIR = "./Images"
@@ -23,8 +26,10 @@ def save_image(array, name):
     img.save(os.path.join(OUTPUT_DIR, name))
 
 # Etap 1: Rozciąganie histogramu obrazu, by zwiększyć kontrast
-def histogram_stretching(image):
-    imin, imax = np.min(image), np.max(image)  # minimalna i maksymalna wartość pikseli
+# imin, imax - zakres całego obrazu, gdy image jest tylko jego fragmentem (kafelkiem)
+def histogram_stretching(image, imin=None, imax=None):
+    if imin is None or imax is None:
+        imin, imax = min_max(image)  # minimalna i maksymalna wartość pikseli (z histogramu)
     stretched = (image - imin) * 255.0 / (imax - imin)  # liniowe przeskalowanie na pełen zakres 0-255
     return stretched.astype(np.uint8)
 
@@ -34,47 +39,87 @@ def denoise_median(image, size=3):
 
 # Etap 3: Wyostrzanie obrazu metodą unsharp masking
 def unsharp_mask(image, sigma=1.0, k=1.5):
-    blurred = gaussian_filter(image, sigma=sigma)  # rozmycie Gaussa o odchyleniu sigma
-    mask = image - blurred                          # maska - różnica między oryginałem a rozmyciem
-    sharpened = image + k * mask                     # dodanie wzmocnionej maski do oryginału
-    return np.clip(sharpened, 0, 255).astype(np.uint8)  # ograniczenie wartości do 0-255
+    # rozmycie Gaussa, maska (oryginał - rozmycie) i dodanie k * maski w float32,
+    # ograniczenie wartości do 0-255 (patrz sharpening.py)
+    return SHARPENING.unsharp(image, sigma=sigma, k=k)
 
 # Etap 4: Opcjonalne wygładzenie końcowe filtrem dolnoprzepustowym Gaussa
 def final_smoothing(image, sigma=0.5):
     return gaussian_filter(image, sigma=sigma).astype(np.uint8)
 
-# Główna funkcja przetwarzająca obraz wg powyższych etapów
-def enhance_bonescan(image_path):
-    original = load_image(image_path)  # Wczytanie oryginalnego obrazu
+# Etapy obróbki jako leniwy graf (patrz pipeline.py): wyniki etapów są
+# zapamiętywane, więc po zmianie parametru, np.
+#     pipeline.set_params("sharpened", k=2.0)
+# liczone są od nowa tylko wyostrzanie i wygładzanie końcowe
+def bonescan_pipeline(original, cache=None):
+    return (Pipeline(cache)
+            .source("original", original)
+            .stage("stretched", histogram_stretching, "original")
+            .stage("denoised", denoise_median, "stretched", size=3)
+            .stage("sharpened", unsharp_mask, "denoised", sigma=1.0, k=1.5)
+            .stage("smoothed", final_smoothing, "sharpened", sigma=0.5))
+
+
+# Etykiety zapisywanych obrazów dla etapów potoku
+BONESCAN_STEPS = {
+    "original": "01_Oryginał",
+    "stretched": "02_Rozciąganie histogramu",
+    "denoised": "03_Filtr medianowy",
+    "sharpened": "04_Wyostrzanie (unsharp)",
+    "smoothed": "05_Wygładzanie końcowe"
+}
 
-    # Kolejne etapy przetwarzania obrazu
-    stretched = histogram_stretching(original)
-    denoised = denoise_median(stretched, size=3)
-    sharpened = unsharp_mask(denoised, sigma=1.0, k=1.5)
-    smoothed = final_smoothing(sharpened, sigma=0.5)
+# Główna funkcja przetwarzająca obraz wg powyższych etapów
+# pipeline - potok z wcześniejszego wywołania (z parametrami zmienionymi przez
+#            set_params); etapy o niezmienionych parametrach nie są liczone ponownie
+# Zwraca potok, żeby można go było użyć w kolejnym wywołaniu
+def enhance_bonescan(image_path, pipeline=None, cache=None):
+    if pipeline is None:
+        pipeline = bonescan_pipeline(load_image(image_path), cache)  # Wczytanie oryginalnego obrazu
+    pipeline.reset_log()
 
     # Przechowujemy wyniki etapów w słowniku (etykieta: obraz)
-    steps = {
-        "01_Oryginał": original,
-        "02_Rozciąganie histogramu": stretched,
-        "03_Filtr medianowy": denoised,
-        "04_Wyostrzanie (unsharp)": sharpened,
-        "05_Wygładzanie końcowe": smoothed
-    }
-
-    # Wyświetlanie i zapisywanie wyników
-    plt.figure(figsize=(15, 8))
-    for i, (label, img) in enumerate(steps.items(), 1):
-        plt.subplot(2, 3, i)
-        plt.imshow(img, cmap='gray')
-        plt.title(label)
-        plt.axis('off')
+    steps = {label: pipeline.compute(name) for name, label in BONESCAN_STEPS.items()}
+    pipeline.report()
+
+    # Zapisywanie wyników
+    for label, img in steps.items():
         save_image(img, f"Z12_{label.replace(' ', '_')}.tif")  # Zapis pojedynczego obrazu
 
-    plt.tight_layout()
+    # Wyświetlanie wyników (szósta komórka siatki 2x3 zostaje pusta)
+    def draw(fig, axes):
+        for ax in axes.flat:
+            ax.axis('off')
+        for ax, (label, img) in zip(axes.flat, steps.items()):
+            ax.imshow(img, cmap='gray')
+            ax.set_title(label)
+        fig.tight_layout()
+
     # Zapis całej figury do pliku
-    plt.savefig(os.path.join(OUTPUT_DIR, f"Z12_steps_combined.png"))
-    plt.show()
+    get_renderer().render(draw, os.path.join(OUTPUT_DIR, f"Z12_steps_combined.png"), 2, 3, figsize=(15, 8))
+    return pipeline
+
+
+# Zakładka kafelków dla etapów 2-4: mediana 3x3, Gauss sigma=1.0 i Gauss sigma=0.5
+BONESCAN_HALO = window_radius(3) + gaussian_radius(1.0) + gaussian_radius(0.5)
+
+# Ta sama obróbka dla bardzo dużych skanów, liczona kafelkami (patrz tiled.py)
+# Najpierw jeden przebieg po kafelkach wyznacza zakres jasności całego obrazu,
+# potem każdy kafelek z zakładką przechodzi przez etapy 1-4.
+# image_path  - plik w INPUT_DIR (TIFF lub .npy) albo tablica/np.memmap
+# output_path - plik wynikowy (.tif przez tifffile lub .npy), None - tablica w pamięci
+# Wynik jest identyczny z etapem "05_Wygładzanie końcowe" funkcji enhance_bonescan
+def enhance_bonescan_tiled(image_path, output_path=None, tile_size=TILE_SIZE):
+    source = open_source(os.path.join(INPUT_DIR, image_path) if isinstance(image_path, str) else image_path)
+    imin, imax = tiled_min_max(source, tile_size)
+
+    def enhance(tile):
+        stretched = histogram_stretching(tile, imin, imax)
+        denoised = denoise_median(stretched, size=3)
+        sharpened = unsharp_mask(denoised, sigma=1.0, k=1.5)
+        return final_smoothing(sharpened, sigma=0.5)
+
+    return process_tiled(source, enhance, BONESCAN_HALO, output_path=output_path, tile_size=tile_size)
 
 
 # Uruchomienie przetwarzania jeśli plik jest głównym modułem
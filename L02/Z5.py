@@ -1,9 +1,9 @@
 import os
-import matplotlib
-matplotlib.use('TkAgg')
-import matplotlib.pyplot as plt
+from rendering import get_renderer, select_backend
+select_backend()  # TkAgg przy dostępnym ekranie, w przeciwnym razie Agg
 import numpy as np
 from PIL import Image
+from point_ops import PointOperation
 
 # Foldery
 INPUT_DIR = "./Images"
@@ -35,18 +35,17 @@ def plot_gray_levels(image, coord, orientation='horizontal'):
         print("Nieprawidłowa orientacja.")
         return
 
-    plt.plot(profile, 'k-')
-    plt.title(f'Profil poziomu szarości ({orientation}), współrzędna={coord}')
-    plt.xlabel('Pozycja piksela')
-    plt.ylabel('Poziom szarości')
-    plt.grid(True)
-    plt.tight_layout()
+    def draw(fig, ax):
+        ax.plot(profile, 'k-')
+        ax.set_title(f'Profil poziomu szarości ({orientation}), współrzędna={coord}')
+        ax.set_xlabel('Pozycja piksela')
+        ax.set_ylabel('Poziom szarości')
+        ax.grid(True)
+        fig.tight_layout()
 
-    try:
-        plt.show()
-    except:
-        plt.savefig(os.path.join(OUTPUT_DIR, f"profile_{orientation}_{coord}.png"))
-        print("Zapisano wykres poziomu szarości.")
+    # Zapis do pliku zawsze, wyświetlenie tylko przy dostępnym ekranie
+    get_renderer().render(draw, os.path.join(OUTPUT_DIR, f"profile_{orientation}_{coord}.png"),
+                          figsize=(6.4, 4.8), message="Zapisano wykres poziomu szarości.")
 
 # ----------------------------
 # 3. Wycinanie podobrazu
@@ -68,10 +67,11 @@ def crop_image(image, x1, y1, x2, y2, output_filename):
 
 # ----------------------------
 # 4. Przekształcenie T(r) = 255 - r
+# Funkcja jest tablicowana raz dla wszystkich poziomów jasności (LUT),
+# a obraz przekształcany jednym indeksowaniem - patrz point_ops.py
 # ----------------------------
 def transformation_T(image, function):
-    vectorized = np.vectorize(function)
-    transformed = vectorized(image).astype(np.uint8)
+    transformed = PointOperation(function)(image)
     img = Image.fromarray(transformed)
     img.show()
     return transformed
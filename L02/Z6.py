@@ -1,10 +1,11 @@
+import functools
 import os
 import math
 import numpy as np
 from PIL import Image
-import matplotlib
-matplotlib.use('TkAgg')
-import matplotlib.pyplot as plt
+from point_ops import PointOperation, apply_lut
+from rendering import get_renderer, select_backend
+select_backend()  # TkAgg przy dostępnym ekranie, w przeciwnym razie Agg
 
 IMAGE_DIR = './Images'
 OUTPUT_DIR = './Images-converted-Z6'
@@ -16,20 +17,20 @@ def load_image_as_array(filename):
     return np.array(img, dtype=np.uint8)
 
 def save_comparison(original_array, processed_array, original_name, suffix):
-    fig, axes = plt.subplots(1, 2, figsize=(12, 6))
-    axes[0].imshow(original_array, cmap='gray', vmin=0, vmax=255)
-    axes[0].set_title('Oryginał')
-    axes[0].axis('off')
-    axes[1].imshow(processed_array, cmap='gray', vmin=0, vmax=255)
-    axes[1].set_title(f'Przetworzony ({suffix})')
-    axes[1].axis('off')
-    plt.tight_layout()
+    def draw(fig, axes):
+        axes[0].imshow(original_array, cmap='gray', vmin=0, vmax=255)
+        axes[0].set_title('Oryginał')
+        axes[0].axis('off')
+        axes[1].imshow(processed_array, cmap='gray', vmin=0, vmax=255)
+        axes[1].set_title(f'Przetworzony ({suffix})')
+        axes[1].axis('off')
+        fig.tight_layout()
 
     save_path = os.path.join(OUTPUT_DIR, f"{os.path.splitext(original_name)[0]}_{suffix}_comparison.png")
-    plt.savefig(save_path)
-    plt.show()
-    plt.close(fig)
-    print(f"Zapisano porównanie: {save_path}")
+    get_renderer().render(draw, save_path, 1, 2, figsize=(12, 6), message=f"Zapisano porównanie: {save_path}")
+
+def negative_np(img_array):
+    return (255 - img_array.astype(np.int16)).astype(np.uint8)
 
 def multiply_constant_np(img_array, c):
     result = np.clip(img_array * c, 0, 255).astype(np.uint8)
@@ -50,39 +51,99 @@ def contrast_transform_value_np(r, m=0.45, e=8):
     r_norm = r / 255
     return int((1 / (1 + (m / r_norm) ** e)) * 255) if r > 0 else 0
 
+# Operacja punktowa (z zapamiętaną LUT) tworzona raz dla każdej pary (m, e)
+@functools.lru_cache(maxsize=None)
+def contrast_operation(m=0.45, e=8):
+    return PointOperation(lambda r: contrast_transform_value_np(r, m, e))
+
 def contrast_transform_np(img_array, m=0.45, e=8):
-    lut = np.array([contrast_transform_value_np(r, m, e) for r in range(256)], dtype=np.uint8)
-    result = lut[img_array]
-    return result
+    return contrast_operation(m, e)(img_array)
 
 def plot_contrast_function(m=0.45, e=8, output_path=None):
-    import numpy as np
-    import matplotlib.pyplot as plt
-
     x = np.arange(256)
     y = np.array([contrast_transform_value_np(r, m, e) for r in x])
 
-    plt.figure(figsize=(8, 5))
-    plt.plot(x, y, label=f'T(r), m={m}, e={e}')
-    plt.title('Funkcja transformacji kontrastu T(r)')
-    plt.xlabel('Poziom wejściowy r')
-    plt.ylabel('Poziom wyjściowy T(r)')
-    plt.grid(True)
-    plt.legend()
+    def draw(fig, ax):
+        ax.plot(x, y, label=f'T(r), m={m}, e={e}')
+        ax.set_title('Funkcja transformacji kontrastu T(r)')
+        ax.set_xlabel('Poziom wejściowy r')
+        ax.set_ylabel('Poziom wyjściowy T(r)')
+        ax.grid(True)
+        ax.legend()
 
-    if output_path:
-        plt.savefig(output_path, dpi=300)
-        plt.close()
-        print(f"Zapisano wykres funkcji kontrastu: {output_path}")
-    else:
-        plt.show()
+    get_renderer().render(draw, output_path, figsize=(8, 5), dpi=300,
+                          message=f"Zapisano wykres funkcji kontrastu: {output_path}")
 
 
+def gamma_correction_value_np(r, gamma=1.0):
+    return ((r / 255.0) ** (1.0 / gamma)) * 255
+
+# Operacja punktowa (z zapamiętaną LUT) tworzona raz dla każdej wartości gamma
+@functools.lru_cache(maxsize=None)
+def gamma_operation(gamma=1.0):
+    return PointOperation(lambda r: gamma_correction_value_np(r, gamma))
+
 def gamma_correction_np(img_array, gamma=1.0):
-    inv_gamma = 1.0 / gamma
-    lut = np.array([((i / 255.0) ** inv_gamma) * 255 for i in range(256)], dtype=np.uint8)
-    result = lut[img_array]
-    return result
+    return gamma_operation(gamma)(img_array)
+
+# ----------------------------
+# Łańcuch przekształceń jasności złączony w jedną tablicę LUT
+# Każde z powyższych przekształceń działa element po elemencie na obrazie
+# uint8, więc jest krokiem point_ops.PointOperation (vectorized=True):
+# tablicowane na wszystkich 256 poziomach daje swoją LUT, a then() składa
+# kolejne kroki w jedną tablicę. Obraz przechodzi przez cały łańcuch
+# w jednym przebiegu (bez pośrednich tablic float), z wynikiem identycznym
+# jak przy osobnych wywołaniach.
+# Przykład: IntensityChain().multiply(1.5).log()(img_array, out=bufor)
+# ----------------------------
+class IntensityChain:
+    def __init__(self, steps=()):
+        self.steps = ()
+        self.operation = None
+        for function, params in steps:
+            self.add(function, params)
+
+    def add(self, function, params):
+        step = functools.partial(function, **params)
+        if self.operation is None:
+            self.operation = PointOperation(step, vectorized=True)
+        else:
+            self.operation = self.operation.then(step, vectorized=True)
+        self.steps += ((function, params),)
+
+    def then(self, function, **params):
+        return IntensityChain(self.steps + ((function, params),))
+
+    def negative(self):
+        return self.then(negative_np)
+
+    def multiply(self, c):
+        return self.then(multiply_constant_np, c=c)
+
+    def log(self):
+        return self.then(log_transform_np)
+
+    def contrast(self, m=0.45, e=8):
+        return self.then(contrast_transform_np, m=m, e=e)
+
+    def gamma(self, gamma=1.0):
+        return self.then(gamma_correction_np, gamma=gamma)
+
+    # Liczba przebiegów po obrazie, które wykonałyby osobne wywołania
+    def __len__(self):
+        return len(self.steps)
+
+    def lut(self):
+        if self.operation is None:
+            return np.arange(256, dtype=np.uint8)
+        return self.operation.lut(np.uint8)
+
+    # img_array - obraz uint8 (LUT ma 256 pozycji)
+    # out - opcjonalna tablica uint8 o kształcie obrazu, do której zapisywany jest wynik
+    def __call__(self, img_array, out=None):
+        if img_array.dtype != np.uint8:
+            raise TypeError(f"IntensityChain wymaga obrazu uint8, a jest {img_array.dtype}")
+        return apply_lut(self.lut(), img_array, out=out)
 
 if __name__ == "__main__":
     # Mnożenie przez 1.5
@@ -1,9 +1,9 @@
 import os
 from PIL import Image
 import numpy as np
-import matplotlib
-matplotlib.use('TkAgg')
-import matplotlib.pyplot as plt
+from rendering import get_renderer, select_backend
+select_backend()  # TkAgg przy dostępnym ekranie, w przeciwnym razie Agg
+from histograms import equalization_lut, histogram, plot_histogram, stack_histograms
 
 # ----------------------------
 # Ścieżki do folderów z obrazami wejściowymi i wynikowymi
@@ -17,28 +17,22 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 # ----------------------------
 # Funkcja wyrównująca histogram obrazu
-# img_array - tablica NumPy z wartościami pikseli obrazu w skali szarości
+# img_array - tablica NumPy (H, W) z wartościami pikseli obrazu w skali szarości;
+#             stos klatek wyrównuje equalize_stack (tablica 3-D mogłaby być
+#             też obrazem RGB (H, W, 3), więc nie jest zgadywana)
 # Zwraca wyrównany obraz jako tablicę NumPy (uint8)
 # ----------------------------
 def equalize_histogram(img_array):
-    # Obliczenie histogramu - liczba pikseli dla każdej wartości od 0 do 255
-    hist, _ = np.histogram(img_array.flatten(), 256, [0, 256])
+    if img_array.ndim != 2:
+        raise ValueError(f"Obraz musi mieć kształt (H, W), a ma {img_array.shape}; "
+                         "stos klatek (klatki, H, W) wyrównuje equalize_stack")
 
-    # Obliczenie dystrybuanty (CDF) histogramu
-    cdf = hist.cumsum()
+    # Histogram - liczba pikseli dla każdej wartości od 0 do 255
+    # (np.bincount bez kopii obrazu, zapamiętywany - patrz histograms.py)
+    hist = histogram(img_array)
 
-    # Maskowanie zer (żeby nie dzielić przez zero)
-    cdf_masked = np.ma.masked_equal(cdf, 0)
-
-    # Minimalna i maksymalna wartość CDF (poza zerami)
-    cdf_min = cdf_masked.min()
-    cdf_max = cdf_masked.max()
-
-    # Normalizacja CDF do zakresu [0,255]
-    cdf_masked = (cdf_masked - cdf_min) * 255 / (cdf_max - cdf_min)
-
-    # Wypełnienie zamaskowanych miejsc zerami i konwersja na uint8
-    cdf_final = np.ma.filled(cdf_masked, 0).astype('uint8')
+    # Tablica przekształcenia (LUT) z dystrybuanty histogramu
+    cdf_final = equalization_lut(hist)
 
     # Zastosowanie przekształcenia CDF do oryginalnej tablicy pikseli
     img_eq = cdf_final[img_array]
@@ -46,6 +40,45 @@ def equalize_histogram(img_array):
     return img_eq
 
 
+# ----------------------------
+# Wyrównanie histogramu każdej klatki stosu (klatki, H, W) uint8, np. z filmu
+# lub mikroskopii poklatkowej
+# Histogramy klatek liczone są bincount na widokach klatek (stack_histograms),
+# LUT wszystkich klatek jednym wywołaniem equalization_lut, a każda klatka
+# przekształcana jest np.take prosto do tablicy wynikowej - bez kopii stosu
+# z indeksami intp i bez tablic pośrednich.
+# temporal_smoothing - None albo współczynnik alfa z (0, 1]: histogram
+#                      klatki t to alfa * h[t] + (1 - alfa) * h[t-1]
+#                      po wygładzeniu, co ogranicza migotanie jasności
+#                      między klatkami (1 - bez wygładzania). Wygładzanie
+#                      jest przyczynowe (tylko klatki wcześniejsze), więc
+#                      pierwsze klatki stosu są wygładzane słabo, a klatka 0
+#                      wcale
+# ----------------------------
+def equalize_stack(stack, temporal_smoothing=None):
+    if stack.ndim != 3:
+        raise ValueError(f"Stos klatek musi mieć kształt (klatki, H, W), a ma {stack.shape}")
+    if temporal_smoothing is not None and not 0 < temporal_smoothing <= 1:
+        raise ValueError(f"Współczynnik wygładzania musi należeć do (0, 1], a jest {temporal_smoothing}")
+    hists = stack_histograms(stack)
+
+    if temporal_smoothing is not None:
+        # Przyczynowa wykładnicza średnia krocząca histogramów (klatki mają tyle
+        # samo pikseli, więc nie trzeba ich normować; pętla po 256 liczbach na klatkę)
+        smoothed = np.empty(hists.shape, dtype=np.float64)
+        smoothed[0] = hists[0]
+        for frame in range(1, len(hists)):
+            smoothed[frame] = (temporal_smoothing * hists[frame]
+                               + (1 - temporal_smoothing) * smoothed[frame - 1])
+        hists = smoothed
+
+    luts = equalization_lut(hists)
+    equalized = np.empty(stack.shape, dtype=np.uint8)
+    for frame in range(len(stack)):
+        np.take(luts[frame], stack[frame], out=equalized[frame])
+    return equalized
+
+
 # ----------------------------
 # Funkcja wyświetlająca obrazy i histogramy oryginalne i wyrównane
 # original - oryginalny obraz jako tablica NumPy
@@ -53,36 +86,35 @@ def equalize_histogram(img_array):
 # title - tytuł wykresu (zazwyczaj nazwa pliku)
 # ----------------------------
 def plot_histograms(original, equalized, title, output_path=None):
-    fig, axes = plt.subplots(2, 2, figsize=(12, 8))
+    # Histogramy liczone od razu (z pamięci podręcznej), rysowanie może odbyć się w tle
+    original_hist = histogram(original)
+    equalized_hist = histogram(equalized)
 
-    # Oryginalny obraz
-    axes[0, 0].imshow(original, cmap='gray', vmin=0, vmax=255)
-    axes[0, 0].set_title('Oryginał')
-    axes[0, 0].axis('off')
+    def draw(fig, axes):
+        # Oryginalny obraz
+        axes[0, 0].imshow(original, cmap='gray', vmin=0, vmax=255)
+        axes[0, 0].set_title('Oryginał')
+        axes[0, 0].axis('off')
 
-    # Histogram oryginału
-    axes[0, 1].hist(original.flatten(), bins=256, color='blue')
-    axes[0, 1].set_title('Histogram oryginału')
+        # Histogram oryginału
+        plot_histogram(axes[0, 1], original_hist, data_range=True, color='blue')
+        axes[0, 1].set_title('Histogram oryginału')
 
-    # Obraz po wyrównaniu
-    axes[1, 0].imshow(equalized, cmap='gray', vmin=0, vmax=255)
-    axes[1, 0].set_title('Po wyrównaniu')
-    axes[1, 0].axis('off')
+        # Obraz po wyrównaniu
+        axes[1, 0].imshow(equalized, cmap='gray', vmin=0, vmax=255)
+        axes[1, 0].set_title('Po wyrównaniu')
+        axes[1, 0].axis('off')
 
-    # Histogram po wyrównaniu
-    axes[1, 1].hist(equalized.flatten(), bins=256, color='green')
-    axes[1, 1].set_title('Histogram po wyrównaniu')
+        # Histogram po wyrównaniu
+        plot_histogram(axes[1, 1], equalized_hist, data_range=True, color='green')
+        axes[1, 1].set_title('Histogram po wyrównaniu')
 
-    # Tytuł całego wykresu
-    fig.suptitle(f'Wyrównanie histogramu: {title}')
-    plt.tight_layout(rect=[0, 0, 1, 0.96])  # Zostaw miejsce na suptitle
+        # Tytuł całego wykresu
+        fig.suptitle(f'Wyrównanie histogramu: {title}')
+        fig.tight_layout(rect=[0, 0, 1, 0.96])  # Zostaw miejsce na suptitle
 
-    if output_path:
-        plt.savefig(output_path, dpi=300)
-        plt.close(fig)
-        print(f"Zapisano wykres porównawczy: {output_path}")
-    else:
-        plt.show()
+    get_renderer().render(draw, output_path, 2, 2, figsize=(12, 8), dpi=300,
+                          message=f"Zapisano wykres porównawczy: {output_path}")
 
 
 
@@ -98,6 +130,8 @@ def process_image(filename):
     image_path = os.path.join(IMAGE_DIR, filename)
     img = Image.open(image_path).convert('L')
     img_array = np.array(img)
+    # Obraz tylko do odczytu - histogram z wyrównania jest użyty ponownie na wykresie
+    img_array.setflags(write=False)
     img_eq_array = equalize_histogram(img_array)
 
     # Ścieżka do zapisu wykresu porównawczego
@@ -1,10 +1,10 @@
 import os
 import numpy as np
-import matplotlib
-matplotlib.use('TkAgg')
-import matplotlib.pyplot as plt
+from rendering import get_renderer, select_backend
+select_backend()  # TkAgg przy dostępnym ekranie, w przeciwnym razie Agg
 from PIL import Image
-from scipy.ndimage import convolve
+from window_ops import local_moments
+from histograms import equalization_lut
 
 # ----------------------------
 # Ścieżki do pliku obrazu i folderu wynikowego
@@ -18,9 +18,27 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 # Lokalna korekcja histogramu dla obrazu w skali szarości
 # image - tablica NumPy z wartościami pikseli
 # mask_size - rozmiar okna (maski) do lokalnej analizy (np. 3,5,7...)
+# method - 'sliding' (przesuwny histogram, domyślnie) lub 'naive'
+#          (pełny histogram liczony od nowa dla każdego piksela)
 # Zwraca lokalnie wyrównany obraz jako tablicę uint8
 # ----------------------------
-def local_histogram_equalization(image, mask_size):
+def local_histogram_equalization(image, mask_size, method='sliding'):
+    if method == 'sliding':
+        return local_histogram_equalization_sliding(image, mask_size)
+    if method == 'naive':
+        return local_histogram_equalization_naive(image, mask_size)
+    if method == 'adaptive':
+        # Kafelki o boku zbliżonym do rozmiaru maski
+        tile_grid = tuple(max(1, round(length / mask_size)) for length in image.shape)
+        return adaptive_histogram_equalization(image, tile_grid)
+    raise ValueError(f"Nieznana metoda: {method}")
+
+
+# ----------------------------
+# Wersja referencyjna - histogram i CDF liczone od nowa dla każdego piksela
+# Koszt O(H*W*(k^2 + 256))
+# ----------------------------
+def local_histogram_equalization_naive(image, mask_size):
     height, width = image.shape
     pad = mask_size // 2
 
@@ -51,6 +69,130 @@ def local_histogram_equalization(image, mask_size):
     return equalized.astype(np.uint8)
 
 
+# ----------------------------
+# Lokalna korekcja histogramu z przesuwnym histogramem
+# Okno przesuwa się kolumna po kolumnie, a histogramy wszystkich wierszy
+# są aktualizowane jednocześnie: jedna kolumna (k pikseli) jest dodawana,
+# jedna usuwana. Histogram jest dwupoziomowy (16 przedziałów po 16 poziomów
+# + 256 poziomów), więc zliczenie pikseli <= wartości środkowej kosztuje
+# najwyżej 32 sumowania zamiast pełnej dystrybuanty 256 poziomów.
+# Koszt O(H*W*k), wynik identyczny z wersją referencyjną.
+# ----------------------------
+def local_histogram_equalization_sliding(image, mask_size):
+    height, width = image.shape
+    pad = mask_size // 2
+
+    # Dopełnienie obrazu odbiciem brzegów (tak samo jak w wersji referencyjnej)
+    padded = np.pad(image, pad, mode='reflect').astype(np.intp)
+
+    rows = np.arange(height)
+    # Indeksy wierszy powtórzone dla każdego z k pikseli kolumny okna
+    column_rows = np.repeat(rows, mask_size)
+    # Okna kolumnowe: padded_columns[c][i] to k pikseli kolumny c dla wiersza i
+    column_windows = np.lib.stride_tricks.sliding_window_view(padded, mask_size, axis=0)
+
+    # Histogram dokładny (256 poziomów) i zgrubny (16 przedziałów) dla każdego wiersza
+    fine = np.zeros((height, 256), dtype=np.int32)
+    coarse = np.zeros((height, 16), dtype=np.int32)
+
+    def update(column, delta):
+        values = column_windows[:, column].ravel()
+        np.add.at(fine, (column_rows, values), delta)
+        np.add.at(coarse, (column_rows, values >> 4), delta)
+
+    # Histogram początkowego okna (kolumny 0..k-1)
+    for column in range(mask_size):
+        update(column, 1)
+
+    equalized = np.zeros_like(image)
+    levels = np.arange(16)
+    total = mask_size * mask_size
+
+    for j in range(width):
+        if j > 0:
+            # Przesunięcie okna: usunięcie lewej kolumny, dodanie prawej
+            update(j - 1, -1)
+            update(j + mask_size - 1, 1)
+
+        values = image[:, j].astype(np.intp)
+        block = values >> 4
+
+        # Liczba pikseli <= wartości środkowej: pełne przedziały zgrubne + reszta w przedziale
+        below = np.where(levels < block[:, None], coarse, 0).sum(axis=1)
+        fine_block = fine[rows[:, None], (block << 4)[:, None] + levels]
+        within = np.where(levels <= (values & 15)[:, None], fine_block, 0).sum(axis=1)
+        cdf = below + within
+
+        # Normalizacja jak w wersji referencyjnej: min CDF to liczba zer w oknie
+        cdf_min = fine[:, 0]
+        equalized[:, j] = (cdf - cdf_min) * 255 / (total - cdf_min + 1e-7)
+
+    return equalized
+
+
+# ----------------------------
+# Adaptacyjne wyrównanie histogramu z interpolacją między kafelkami (CLAHE)
+# Obraz dzielony jest na siatkę tile_grid = (wiersze, kolumny) kafelków.
+# Dla każdego kafelka liczony jest jeden histogram i jego LUT (jak w Z7),
+# a wartość piksela to interpolacja dwuliniowa LUT czterech kafelków,
+# których środki go otaczają (przy brzegach obrazu - najbliższych).
+# clip_limit - obcięcie histogramu kafelka na clip_limit * średnia liczba
+#              pikseli na poziom; nadmiar rozdzielany jest równo na wszystkie
+#              poziomy, co ogranicza wzmocnienie szumu w jednolitych
+#              obszarach (None - bez obcięcia)
+# Koszt: jeden przebieg po obrazie (histogramy) i cztery odczyty LUT na piksel
+# ----------------------------
+def adaptive_histogram_equalization(image, tile_grid=(8, 8), clip_limit=2.0):
+    if image.dtype != np.uint8:
+        raise TypeError(f"Adaptacyjne wyrównanie wymaga obrazu uint8, a jest {image.dtype}")
+    rows, cols = tile_grid
+    # Każdy kafelek musi mieć co najmniej jeden wiersz i jedną kolumnę pikseli
+    for axis, tiles, size in (('wierszy', rows, image.shape[0]), ('kolumn', cols, image.shape[1])):
+        if not 1 <= tiles <= size:
+            raise ValueError(f"Liczba {axis} kafelków musi należeć do [1, {size}], a jest {tiles}")
+    row_edges = np.linspace(0, image.shape[0], rows + 1).astype(int)
+    col_edges = np.linspace(0, image.shape[1], cols + 1).astype(int)
+
+    # Histogramy kafelków jednego rzędu jednym zliczeniem: indeks = kolumna kafelka * 256 + poziom
+    # (najmniejszy typ całkowity mieszczący cols * 256 poziomów, indeksy tylko dla pasa rzędu)
+    index_dtype = np.min_scalar_type(cols * 256 - 1)
+    offsets = (np.repeat(np.arange(cols), np.diff(col_edges)) * 256).astype(index_dtype)
+    hists = np.empty((rows, cols, 256))
+    for row in range(rows):
+        band = image[row_edges[row]:row_edges[row + 1]]
+        hists[row] = np.bincount((offsets + band).ravel(), minlength=cols * 256).reshape(cols, 256)
+
+    if clip_limit is not None:
+        limits = clip_limit * hists.sum(axis=2, keepdims=True) / 256
+        excess = np.maximum(hists - limits, 0).sum(axis=2, keepdims=True)
+        hists = np.minimum(hists, limits) + excess / 256
+
+    luts = equalization_lut(hists).astype(np.float32)
+
+    # Indeksy sąsiednich kafelków i wagi interpolacji dla każdego wiersza i kolumny
+    def neighbours(edges, length):
+        centres = (edges[:-1] + edges[1:] - 1) / 2
+        positions = np.arange(length)
+        lower = np.clip(np.searchsorted(centres, positions, side='right') - 1, 0, len(centres) - 1)
+        upper = np.minimum(lower + 1, len(centres) - 1)
+        span = np.where(upper > lower, centres[upper] - centres[lower], 1)
+        weight = np.clip((positions - centres[lower]) / span, 0, 1).astype(np.float32)
+        return lower, upper, weight
+
+    top, bottom, wy = neighbours(row_edges, image.shape[0])
+    left, right, wx = neighbours(col_edges, image.shape[1])
+    wy = wy[:, None]
+    wx = wx[None, :]
+
+    def lookup(tile_rows, tile_cols):
+        return luts[tile_rows[:, None], tile_cols[None, :], image]
+
+    upper_row = lookup(top, left) * (1 - wx) + lookup(top, right) * wx
+    lower_row = lookup(bottom, left) * (1 - wx) + lookup(bottom, right) * wx
+    equalized = upper_row * (1 - wy) + lower_row * wy
+    return np.rint(equalized).astype(np.uint8)
+
+
 # ----------------------------
 # Lokalna poprawa statystyczna obrazu - wyostrzenie i korekcja gamma
 # image - tablica NumPy obrazu
@@ -60,11 +202,17 @@ def local_histogram_equalization(image, mask_size):
 # Zwraca poprawiony obraz jako uint8
 # ----------------------------
 def local_statistics_enhancement(image, mask_size, a=1.5, gamma=1.0):
-    # Filtr uśredniający (jednostajna maska)
-    kernel = np.ones((mask_size, mask_size)) / (mask_size ** 2)
-
-    # Obliczenie lokalnej średniej konwolucją (tryb odbicia brzegów)
-    local_mean = convolve(image.astype(float), kernel, mode='reflect')
+    # Lokalna średnia z tablicy sum skumulowanych - koszt na piksel nie zależy
+    # od rozmiaru maski (patrz window_ops.local_moments). Dopełnienie
+    # 'symmetric' odpowiada trybowi 'reflect' splotu scipy.
+    # Średnia jest dokładna (suma całkowita / k^2), a dawny splot
+    # scipy.ndimage.convolve z maską 1/k^2 sumował zaokrąglone iloczyny float,
+    # więc wynik różni się o 1 poziom tam, gdzie wartość wypada (prawie)
+    # dokładnie na liczbie całkowitej i obcięcie astype(uint8) daje inny poziom.
+    # Dla hidden-symbols.tif (65536 pikseli): 7901 pikseli przy masce 9x9,
+    # 26 przy 13x13, 6 przy 17x17 i 2 przy 21x21.
+    padded = np.pad(image, mask_size // 2, mode='symmetric')
+    local_mean = local_moments(padded, mask_size, outputs=('mean',))['mean']
 
     # Wyostrzenie: oryginał + wzmocniona różnica między oryginałem a lokalną średnią
     sharpened = image + a * (image - local_mean)
@@ -107,29 +255,26 @@ def process_image(image, mask_sizes):
         print(f"Zapisano: {eq_path}, {enhanced_path}")
 
         # Tworzenie wykresu tylko z obrazami (bez histogramów)
-        fig, axes = plt.subplots(1, 3, figsize=(15, 5))
-
-        axes[0].imshow(image, cmap='gray', vmin=0, vmax=255)
-        axes[0].set_title('Oryginał')
-        axes[0].axis('off')
+        def draw(fig, axes, size=size, eq=eq, enhanced=enhanced):
+            axes[0].imshow(image, cmap='gray', vmin=0, vmax=255)
+            axes[0].set_title('Oryginał')
+            axes[0].axis('off')
 
-        axes[1].imshow(eq, cmap='gray', vmin=0, vmax=255)
-        axes[1].set_title(f'Lokalne wyrównanie ({size}x{size})')
-        axes[1].axis('off')
+            axes[1].imshow(eq, cmap='gray', vmin=0, vmax=255)
+            axes[1].set_title(f'Lokalne wyrównanie ({size}x{size})')
+            axes[1].axis('off')
 
-        axes[2].imshow(enhanced, cmap='gray', vmin=0, vmax=255)
-        axes[2].set_title(f'Poprawa statystyczna ({size}x{size})')
-        axes[2].axis('off')
+            axes[2].imshow(enhanced, cmap='gray', vmin=0, vmax=255)
+            axes[2].set_title(f'Poprawa statystyczna ({size}x{size})')
+            axes[2].axis('off')
 
-        plt.suptitle(f'Porównanie metod - maska {size}x{size}')
-        plt.tight_layout(rect=[0, 0, 1, 0.95])
+            fig.suptitle(f'Porównanie metod - maska {size}x{size}')
+            fig.tight_layout(rect=[0, 0, 1, 0.95])
 
         # Zapis wykresu jako PNG
         comparison_path = os.path.join(OUTPUT_DIR, f"comparison_mask_{size}x{size}.png")
-        plt.savefig(comparison_path)
-        plt.close(fig)
-
-        print(f"Zapisano wykres porównawczy: {comparison_path}")
+        get_renderer().render(draw, comparison_path, 1, 3, figsize=(15, 5),
+                              message=f"Zapisano wykres porównawczy: {comparison_path}")
 
 
 
@@ -1,17 +1,37 @@
 import os
 import numpy as np
 from PIL import Image
-import matplotlib
-matplotlib.use('TkAgg')
-import matplotlib.pyplot as plt
+from rendering import get_renderer, select_backend
+select_backend()  # TkAgg przy dostępnym ekranie, w przeciwnym razie Agg
+from histograms import histogram, plot_histogram
+from window_ops import box_sum, running_min, running_max, histogram_median
 
 INPUT_DIR = "./Images"
 OUTPUT_DIR = "./Images-converted-Z9"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def apply_average_filter(image, kernel_size):
+# ----------------------------
+# Wektorowe odpowiedniki pętli - wynik identyczny bit po bicie
+# - średnia: suma z tablicy sum skumulowanych podzielona przez k^2
+#   (z tym samym rzutowaniem float32 -> uint8 co w pętli)
+# - min/max: algorytm van Herka/Gil-Wermana (rozdzielnie po osiach)
+# - mediana: histogram skumulowany liczony sumami w oknie
+# ----------------------------
+VECTORIZED_FILTERS = {
+    'average': lambda padded, size: (box_sum(padded, size) / (size * size)).astype(np.float32).astype(np.uint8),
+    'median': lambda padded, size: histogram_median(padded, size).astype(np.uint8),
+    'min': lambda padded, size: running_min(padded, size).astype(np.uint8),
+    'max': lambda padded, size: running_max(padded, size).astype(np.uint8),
+}
+
+
+def apply_average_filter(image, kernel_size, backend='vectorized'):
     pad = kernel_size // 2
     padded = np.pad(image, pad, mode='reflect')
+    if backend == 'vectorized':
+        return VECTORIZED_FILTERS['average'](padded, kernel_size)
+    if backend != 'loop':
+        raise ValueError(f"Nieznany backend: {backend}")
     filtered = np.zeros_like(image, dtype=np.float32)
     for i in range(image.shape[0]):
         for j in range(image.shape[1]):
@@ -19,9 +39,13 @@ def apply_average_filter(image, kernel_size):
             filtered[i, j] = np.mean(neighborhood)
     return filtered.astype(np.uint8)
 
-def apply_median_filter(image, kernel_size):
+def apply_median_filter(image, kernel_size, backend='vectorized'):
     pad = kernel_size // 2
     padded = np.pad(image, pad, mode='reflect')
+    if backend == 'vectorized':
+        return VECTORIZED_FILTERS['median'](padded, kernel_size)
+    if backend != 'loop':
+        raise ValueError(f"Nieznany backend: {backend}")
     filtered = np.zeros_like(image)
     for i in range(image.shape[0]):
         for j in range(image.shape[1]):
@@ -29,9 +53,13 @@ def apply_median_filter(image, kernel_size):
             filtered[i, j] = np.median(neighborhood)
     return filtered.astype(np.uint8)
 
-def apply_min_filter(image, kernel_size):
+def apply_min_filter(image, kernel_size, backend='vectorized'):
     pad = kernel_size // 2
     padded = np.pad(image, pad, mode='reflect')
+    if backend == 'vectorized':
+        return VECTORIZED_FILTERS['min'](padded, kernel_size)
+    if backend != 'loop':
+        raise ValueError(f"Nieznany backend: {backend}")
     filtered = np.zeros_like(image)
     for i in range(image.shape[0]):
         for j in range(image.shape[1]):
@@ -39,9 +67,13 @@ def apply_min_filter(image, kernel_size):
             filtered[i, j] = np.min(neighborhood)
     return filtered.astype(np.uint8)
 
-def apply_max_filter(image, kernel_size):
+def apply_max_filter(image, kernel_size, backend='vectorized'):
     pad = kernel_size // 2
     padded = np.pad(image, pad, mode='reflect')
+    if backend == 'vectorized':
+        return VECTORIZED_FILTERS['max'](padded, kernel_size)
+    if backend != 'loop':
+        raise ValueError(f"Nieznany backend: {backend}")
     filtered = np.zeros_like(image)
     for i in range(image.shape[0]):
         for j in range(image.shape[1]):
@@ -49,14 +81,14 @@ def apply_max_filter(image, kernel_size):
             filtered[i, j] = np.max(neighborhood)
     return filtered.astype(np.uint8)
 
-def process_image(path, kernel_sizes):
+def process_image(path, kernel_sizes, backend='vectorized'):
     img = np.array(Image.open(os.path.join(INPUT_DIR, path)).convert('L'))
     results = {'Original': img}
     for size in kernel_sizes:
-        results[f'Average {size}x{size}'] = apply_average_filter(img, size)
-        results[f'Median {size}x{size}'] = apply_median_filter(img, size)
-        results[f'Min {size}x{size}'] = apply_min_filter(img, size)
-        results[f'Max {size}x{size}'] = apply_max_filter(img, size)
+        results[f'Average {size}x{size}'] = apply_average_filter(img, size, backend)
+        results[f'Median {size}x{size}'] = apply_median_filter(img, size, backend)
+        results[f'Min {size}x{size}'] = apply_min_filter(img, size, backend)
+        results[f'Max {size}x{size}'] = apply_max_filter(img, size, backend)
     return results
 
 
@@ -66,47 +98,44 @@ def plot_results(results, title, image_name):
     cols = 4
     rows = (n + cols - 1) // cols
 
-    plt.figure(figsize=(cols * 5, rows * 5))
-    for i, key in enumerate(keys, 1):
-        plt.subplot(rows, cols, i)
-        plt.imshow(results[key], cmap='gray')
-        plt.title(key)
-        plt.axis('off')
+    def draw(fig, axes):
+        for ax in axes.flat:
+            ax.axis('off')
+        for ax, key in zip(axes.flat, keys):
+            ax.imshow(results[key], cmap='gray')
+            ax.set_title(key)
 
-    plt.suptitle(title, fontsize=18)
-    plt.tight_layout(rect=[0, 0, 1, 0.96])
+        fig.suptitle(title, fontsize=18)
+        fig.tight_layout(rect=[0, 0, 1, 0.96])
 
     # Zapis całego porównania do pliku
     filename = f"{image_name}_comparison.png"
-    plt.savefig(os.path.join(OUTPUT_DIR, filename), dpi=300)
-    print(f"Zapisano porównanie do: {filename}")
-
-    plt.show()
+    get_renderer().render(draw, os.path.join(OUTPUT_DIR, filename), rows, cols, figsize=(cols * 5, rows * 5),
+                          dpi=300, message=f"Zapisano porównanie do: {filename}")
 
 
 def plot_histograms(results, kernel_sizes, image_name):
-    plt.figure(figsize=(10, 6))
+    original_hist = histogram(results['Original'])
+    median_hists = {size: histogram(results[f'Median {size}x{size}']) for size in kernel_sizes}
 
-    # Histogram oryginału
-    plt.hist(results['Original'].ravel(), bins=256, range=(0, 256), color='gray', alpha=0.7, label='Oryginał')
+    def draw(fig, ax):
+        # Histogram oryginału
+        plot_histogram(ax, original_hist, color='gray', alpha=0.7, label='Oryginał')
 
-    # Histogramy filtrów medianowych
-    for size in kernel_sizes:
-        plt.hist(results[f'Median {size}x{size}'].ravel(), bins=256, range=(0, 256), alpha=0.5,
-                 label=f'Mediana {size}x{size}')
+        # Histogramy filtrów medianowych
+        for size, hist in median_hists.items():
+            plot_histogram(ax, hist, alpha=0.5, label=f'Mediana {size}x{size}')
 
-    plt.legend()
-    plt.title('Histogramy obrazu oryginalnego i filtrów medianowych')
-    plt.xlabel('Wartość piksela')
-    plt.ylabel('Liczba pikseli')
-    plt.tight_layout()
+        ax.legend()
+        ax.set_title('Histogramy obrazu oryginalnego i filtrów medianowych')
+        ax.set_xlabel('Wartość piksela')
+        ax.set_ylabel('Liczba pikseli')
+        fig.tight_layout()
 
     # Zapis histogramu do pliku
     filename = f"{image_name}_histograms.png"
-    plt.savefig(os.path.join(OUTPUT_DIR, filename), dpi=300)
-    print(f"Zapisano histogramy do: {filename}")
-
-    plt.show()
+    get_renderer().render(draw, os.path.join(OUTPUT_DIR, filename), figsize=(10, 6), dpi=300,
+                          message=f"Zapisano histogramy do: {filename}")
 
 
 kernel_sizes = [3, 5, 7]
@@ -116,8 +145,9 @@ images = {
     'salt_pepper': 'cboard_salt_pepper.tif'
 }
 
-for image_name, path in images.items():
-    print(f"\nPrzetwarzanie obrazu: {path}")
-    results = process_image(path, kernel_sizes)
-    plot_results(results, f"Redukcja szumu: {image_name.replace('_', ' ')}", image_name)
-    plot_histograms(results, kernel_sizes, image_name)
+if __name__ == "__main__":
+    for image_name, path in images.items():
+        print(f"\nPrzetwarzanie obrazu: {path}")
+        results = process_image(path, kernel_sizes)
+        plot_results(results, f"Redukcja szumu: {image_name.replace('_', ' ')}", image_name)
+        plot_histograms(results, kernel_sizes, image_name)
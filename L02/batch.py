@@ -0,0 +1,121 @@
+import argparse
+import functools
+import importlib
+import os
+import sys
+import time
+import traceback
+import warnings
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+# ----------------------------
+# Równoległe przetwarzanie listy obrazów
+# Funkcja przetwarzająca (np. Z7.equalize_histogram albo Z9.process_image)
+# wywoływana jest dla każdego elementu listy w puli procesów. Wyniki zwracane
+# są w kolejności wejścia, niezależnie od tego, który proces skończy pierwszy.
+# Błąd jednego obrazu nie przerywa całej listy - jak pętla try/except w Z7,
+# jest zapisywany w wyniku razem z czasem przetwarzania.
+# Procesy robocze używają backendu Agg (bez okien), więc plt.show() w
+# przetwarzanych funkcjach nic nie blokuje, a wykresy zapisywane przez
+# rendering.get_renderer() są rysowane w tle - przed zakończeniem elementu
+# proces czeka na ich zapis (błąd zapisu trafia do wyniku elementu).
+# Uruchomienie: python batch.py Z7.process_image [pliki ...] [-j liczba_procesów]
+# ----------------------------
+INPUT_DIR = './Images'
+
+# item    - element wejściowy (np. nazwa pliku)
+# result  - wynik funkcji (None przy błędzie lub gdy keep_results=False)
+# seconds - czas przetwarzania elementu w procesie roboczym
+# error   - None albo opis wyjątku z pełnym śladem stosu
+BatchResult = namedtuple('BatchResult', ['item', 'result', 'seconds', 'error'])
+
+
+# Funkcja podana jako tekst 'moduł.funkcja' (np. 'Z9.process_image')
+def resolve_function(function):
+    if callable(function):
+        return function
+    module_name, _, function_name = function.rpartition('.')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def init_worker():
+    os.environ['MPLBACKEND'] = 'Agg'
+    import matplotlib.pyplot as plt
+    plt.switch_backend('Agg')
+    warnings.filterwarnings('ignore', message='.*non-interactive.*')
+    # Nowy obiekt rysujący dla backendu Agg (wątek rodzica nie istnieje po fork)
+    from rendering import reset_renderer
+    reset_renderer()
+
+
+def run_item(function, args, kwargs, keep_results, item):
+    import matplotlib.pyplot as plt
+    from rendering import wait_for_rendering
+    start = time.perf_counter()
+    try:
+        result = resolve_function(function)(item, *args, **kwargs)
+        # Procesy puli kończą się bez atexit - wykresy z tła trzeba dokończyć tutaj
+        wait_for_rendering()
+        error = None
+    except Exception:
+        result = None
+        error = traceback.format_exc()
+        # Wykresy zlecone przed błędem nie mogą trafić do wyniku następnego elementu
+        try:
+            wait_for_rendering()
+        except Exception:
+            pass
+    finally:
+        # Wykresy niezamknięte przez funkcję nie gromadzą się w procesie
+        plt.close('all')
+    seconds = time.perf_counter() - start
+    return BatchResult(item, result if keep_results else None, seconds, error)
+
+
+# ----------------------------
+# function     - funkcja (na poziomie modułu, żeby dało się ją przekazać do
+#                procesu) lub tekst 'moduł.funkcja'
+# items        - lista elementów; function(item, *args, **kwargs)
+# workers      - liczba procesów (None = liczba rdzeni, 0 = w bieżącym procesie)
+# keep_results - czy odsyłać wyniki funkcji (duże tablice kosztują kopiowanie)
+# Zwraca listę BatchResult w kolejności items
+# ----------------------------
+def run_batch(function, items, workers=None, args=(), kwargs=None, keep_results=True):
+    task = functools.partial(run_item, function, tuple(args), kwargs or {}, keep_results)
+    if workers == 0:
+        init_worker()
+        return [task(item) for item in items]
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        return list(executor.map(task, items))
+
+
+def print_summary(results, elapsed=None):
+    for result in results:
+        status = 'OK' if result.error is None else 'BŁĄD'
+        print(f"{str(result.item):<40} {result.seconds:8.3f} s  {status}")
+    for result in results:
+        if result.error is not None:
+            print(f"\nBłąd przetwarzania {result.item}:\n{result.error}")
+    failed = sum(result.error is not None for result in results)
+    total = sum(result.seconds for result in results)
+    print(f"Przetworzono: {len(results) - failed}/{len(results)}, suma czasów: {total:.3f} s"
+          + (f", czas całkowity: {elapsed:.3f} s" if elapsed is not None else ''))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Równoległe przetwarzanie obrazów z katalogu Images')
+    parser.add_argument('function', help="funkcja przetwarzająca, np. Z7.process_image")
+    parser.add_argument('items', nargs='*', help='pliki (domyślnie wszystkie z katalogu Images)')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='liczba procesów (0 = bez puli)')
+    arguments = parser.parse_args(argv)
+
+    items = arguments.items or sorted(os.listdir(INPUT_DIR))
+    start = time.perf_counter()
+    results = run_batch(arguments.function, items, arguments.workers, keep_results=False)
+    print_summary(results, time.perf_counter() - start)
+    return 0 if all(result.error is None for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,444 @@
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+from PIL import Image
+
+# ----------------------------
+# Pomiary czasu dla szybszych wersji funkcji z zadań L02
+# Uruchomienie: python benchmarks.py [nazwa_pomiaru ...]
+# Bez argumentów wykonywane są wszystkie pomiary
+# ----------------------------
+INPUT_DIR = "./Images"
+
+
+def load_image(filename):
+    return np.array(Image.open(os.path.join(INPUT_DIR, filename)).convert('L'))
+
+
+# Szczytowe zużycie pamięci (bajty) zaalokowanej w trakcie wywołania
+def peak_memory(function, *args, **kwargs):
+    tracemalloc.start()
+    try:
+        function(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# Najkrótszy czas z kilku powtórzeń (w sekundach) oraz wynik ostatniego wywołania
+def measure(function, *args, repeat=1, **kwargs):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+# ----------------------------
+# Z8: lokalne wyrównanie histogramu - wersja referencyjna i przesuwny histogram
+# ----------------------------
+def benchmark_local_histogram_equalization(mask_sizes=(9, 13, 17, 21)):
+    from Z8 import local_histogram_equalization
+
+    image = load_image('hidden-symbols.tif')
+    print(f"Z8 local_histogram_equalization, hidden-symbols.tif {image.shape}")
+    print(f"{'maska':>7} | {'naive [s]':>10} | {'sliding [s]':>11} | {'przysp.':>7} | zgodne")
+    for size in mask_sizes:
+        naive_time, naive = measure(local_histogram_equalization, image, size, method='naive')
+        sliding_time, sliding = measure(local_histogram_equalization, image, size, method='sliding')
+        print(f"{size:>3}x{size:<3} | {naive_time:>10.3f} | {sliding_time:>11.3f} | "
+              f"{naive_time / sliding_time:>6.1f}x | {np.array_equal(naive, sliding)}")
+
+
+# ----------------------------
+# Z9: filtry sąsiedztwa - pętla a backend wektorowy, dla k = 3, 5, 7;
+# mediana także względem scipy.ndimage.median_filter na bonescan.tif
+# ----------------------------
+def benchmark_neighborhood_filters(kernel_sizes=(3, 5, 7)):
+    from Z9 import apply_average_filter, apply_median_filter, apply_min_filter, apply_max_filter
+
+    filters = {
+        'average': apply_average_filter,
+        'median': apply_median_filter,
+        'min': apply_min_filter,
+        'max': apply_max_filter,
+    }
+    image = load_image('cboard_salt_pepper.tif')
+    print(f"Z9 filtry sąsiedztwa, cboard_salt_pepper.tif {image.shape}")
+    print(f"{'filtr':>8} | {'k':>3} | {'loop [s]':>9} | {'vectorized [s]':>14} | {'przysp.':>8} | zgodne")
+    for name, function in filters.items():
+        for size in kernel_sizes:
+            loop_time, loop = measure(function, image, size, backend='loop')
+            fast_time, fast = measure(function, image, size, backend='vectorized', repeat=3)
+            print(f"{name:>8} | {size:>3} | {loop_time:>9.3f} | {fast_time:>14.4f} | "
+                  f"{loop_time / fast_time:>7.0f}x | {np.array_equal(loop, fast)}")
+
+    # Mediana na obrazie o wielu poziomach jasności a scipy.ndimage.median_filter
+    # (np.pad 'reflect' odpowiada trybowi 'mirror' scipy)
+    from scipy.ndimage import median_filter
+    image = load_image('bonescan.tif')
+    print(f"mediana, bonescan.tif {image.shape}, {len(np.unique(image))} poziomów")
+    for size in kernel_sizes:
+        scipy_time, expected = measure(median_filter, image, size=size, mode='mirror', repeat=3)
+        fast_time, fast = measure(apply_median_filter, image, size, backend='vectorized', repeat=3)
+        print(f"  k={size}: median_filter {scipy_time:.3f} s, vectorized {fast_time:.3f} s, "
+              f"zgodne: {np.array_equal(expected, fast)}")
+
+
+# ----------------------------
+# Z10: filtr Gaussa - pętla referencyjna, dwa przebiegi 1-D i FFT
+# ----------------------------
+def benchmark_gaussian_filter(kernel_sizes=(3, 7, 11, 19), sigma=2.0):
+    from Z10 import apply_gaussian_filter, choose_gaussian_method
+
+    image = load_image('zoneplate.tif')
+    print(f"Z10 apply_gaussian_filter (sigma={sigma}), zoneplate.tif {image.shape}")
+    print(f"{'k':>3} | {'loop [s]':>9} | {'separable [s]':>13} | {'fft [s]':>8} | {'auto':>9} | zgodne")
+    for size in kernel_sizes:
+        loop_time, loop = measure(apply_gaussian_filter, image, size, sigma, method='loop')
+        separable_time, separable = measure(apply_gaussian_filter, image, size, sigma, method='separable', repeat=3)
+        fft_time, fft = measure(apply_gaussian_filter, image, size, sigma, method='fft', repeat=3)
+        identical = np.array_equal(loop, separable) and np.array_equal(loop, fft)
+        print(f"{size:>3} | {loop_time:>9.3f} | {separable_time:>13.4f} | {fft_time:>8.4f} | "
+              f"{choose_gaussian_method(size, image.shape):>9} | {identical}")
+
+
+# ----------------------------
+# Z6: przekształcenia jasności wykonywane w __main__ Z6 - osobne wywołania
+# funkcji (tablice pośrednie float) a IntensityChain z jedną LUT i wynikiem
+# zapisywanym do bufora out=. Czas i szczyt pamięci są mierzone, liczba
+# przebiegów po obrazie i uniknięte tablice pośrednie wynikają z długości łańcucha.
+# ----------------------------
+def benchmark_intensity_chain():
+    from Z6 import load_image_as_array, IntensityChain
+
+    # Te same obrazy i parametry co w __main__ Z6 (każde przekształcenie osobno)
+    # oraz łańcuchy kilku przekształceń, które IntensityChain składa w jedną LUT
+    workloads = [
+        ('chest-xray.tif', IntensityChain().multiply(1.5)),
+        ('pollen-dark.tif', IntensityChain().multiply(1.5)),
+        ('spectrum.tif', IntensityChain().multiply(1.5)),
+        ('spectrum.tif', IntensityChain().log()),
+        ('chest-xray.tif', IntensityChain().contrast()),
+        ('einstein-low-contrast.tif', IntensityChain().contrast()),
+        ('pollen-lowcontrast.tif', IntensityChain().contrast()),
+        ('aerial_view.tif', IntensityChain().gamma(0.5)),
+        ('spectrum.tif', IntensityChain().negative().log().gamma(0.5)),
+        ('chest-xray.tif', IntensityChain().multiply(1.5).contrast()),
+        ('pollen-dark.tif', IntensityChain().multiply(1.5).log().gamma(2.0).contrast()),
+    ]
+    print("Z6 - osobne wywołania a IntensityChain (LUT, wynik w buforze out=)")
+    print(f"{'obraz':>25} | {'przekształcenie':>58} | {'czas [ms]':>15} | "
+          f"{'szczyt pamięci [KiB]':>20} | {'przebiegi po obrazie':>52} | zgodne")
+    for filename, chain in workloads:
+        image = load_image_as_array(filename)
+        out = np.empty_like(image)
+
+        def separate():
+            result = image
+            for function, params in chain.steps:
+                result = function(result, **params)
+            return result
+
+        name = ' -> '.join(f"{function.__name__.split('_')[0]}({', '.join(map(str, params.values()))})"
+                           for function, params in chain.steps)
+        # Osobne wywołania: jeden przebieg i jedna tablica wynikowa na krok;
+        # łańcuch: jeden przebieg LUT do bufora out, bez tablic pośrednich
+        passes = f"przebiegi: {len(chain)} -> 1 (LUT), uniknięte tablice pośrednie: {len(chain) - 1}"
+        chain.lut()
+        separate_time, expected = measure(separate, repeat=5)
+        fused_time, fused = measure(chain, image, out=out, repeat=5)
+        separate_peak = peak_memory(separate) / 1024
+        fused_peak = peak_memory(chain, image, out=out) / 1024
+        print(f"{filename:>25} | {name:>58} | "
+              f"{separate_time * 1e3:>6.2f} -> {fused_time * 1e3:<5.2f} | "
+              f"{separate_peak:>9.0f} -> {fused_peak:<7.1f} | {passes:>52} | {np.array_equal(expected, fused)}")
+
+
+# ----------------------------
+# Z12 - obróbka skanu kośćca dla całego obrazu a kafelkami
+# bonescan.tif powielony repeat x repeat razy i zapisany jako .npy (np.memmap)
+# ----------------------------
+def benchmark_tiled_bonescan(repeat=4, tile_size=1024):
+    import tempfile
+    from Z12 import denoise_median, enhance_bonescan_tiled, final_smoothing, histogram_stretching, unsharp_mask
+
+    def whole(image):
+        stretched = histogram_stretching(image)
+        return final_smoothing(unsharp_mask(denoise_median(stretched, size=3), sigma=1.0, k=1.5), sigma=0.5)
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = os.path.join(directory, 'bonescan.npy')
+        np.save(source_path, np.tile(load_image('bonescan.tif'), (repeat, repeat)))
+        source = np.load(source_path, mmap_mode='r')
+        print(f"Z12 bonescan.tif x{repeat}x{repeat} {source.shape}, kafelki {tile_size}x{tile_size}")
+
+        whole_time, expected = measure(whole, np.asarray(source))
+        whole_peak = peak_memory(whole, np.asarray(source))
+        output_path = os.path.join(directory, 'enhanced.npy')
+        tiled_time, tiled = measure(enhance_bonescan_tiled, source, output_path, tile_size)
+        tiled_peak = peak_memory(enhance_bonescan_tiled, source, output_path, tile_size)
+        print(f"cały obraz: {whole_time:6.2f} s, szczyt pamięci {whole_peak / 2**20:8.1f} MiB")
+        print(f"kafelki:    {tiled_time:6.2f} s, szczyt pamięci {tiled_peak / 2**20:8.1f} MiB, "
+              f"identyczne: {np.array_equal(expected, tiled)}")
+        del source, tiled
+
+
+# ----------------------------
+# Z11/Z12 - szczytowe zużycie pamięci (RSS) wyostrzania: dawna wersja na
+# uint8/float64 a SharpeningEngine w float32. Każdy pomiar w osobnym
+# procesie (ru_maxrss to szczyt całego procesu), od stanu po wczytaniu obrazu.
+# ----------------------------
+def old_unsharp_mask(image, sigma=1.0, k=1.5):
+    from scipy.ndimage import gaussian_filter
+    blurred = gaussian_filter(image, sigma=sigma)
+    mask = image - blurred
+    sharpened = image + k * mask
+    return np.clip(sharpened, 0, 255).astype(np.uint8)
+
+
+def sharpening_rss_child(variant, filename, scale):
+    import resource
+    from sharpening import SharpeningEngine
+    image = np.tile(load_image(filename), (scale, scale))
+    engine = SharpeningEngine()
+    out = np.empty_like(image)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    for _ in range(3):
+        if variant == 'uint8/float64':
+            old_unsharp_mask(image)
+        else:
+            engine.unsharp(image, sigma=1.0, k=1.5, out=out)
+    elapsed = (time.perf_counter() - start) / 3
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{(peak - baseline) / 1024:.1f} {elapsed:.4f} {image.nbytes / 2**20:.1f}")
+
+
+def benchmark_sharpening_memory(images=(('text-dipxe-blurred.tif', 1), ('bonescan.tif', 4))):
+    import subprocess
+    print(f"{'obraz':>26} | {'MiB obrazu':>10} | {'wariant':>14} | {'przyrost RSS [MiB]':>18} | {'czas [ms]':>9}")
+    for filename, scale in images:
+        for variant in ('uint8/float64', 'float32'):
+            output = subprocess.run([sys.executable, __file__, '--sharpening-rss', variant, filename, str(scale)],
+                                    capture_output=True, text=True, check=True).stdout.split()
+            rss, elapsed, size = float(output[0]), float(output[1]), float(output[2])
+            print(f"{filename + f' x{scale}':>26} | {size:>10.1f} | {variant:>14} | {rss:>18.1f} | {elapsed * 1e3:>9.1f}")
+
+
+# ----------------------------
+# Z11 - Sobel w czterech kierunkach: cztery sploty 3x3 a sobel_gradients
+# (obraz powielony, żeby przypominał klatkę z kamery inspekcyjnej)
+# ----------------------------
+def benchmark_sobel(filename='circuitmask.tif', scale=4):
+    from scipy.ndimage import convolve
+    from Z11 import sobel_kernels
+    from gradients import sobel_gradients
+
+    image = np.tile(load_image(filename), (scale, scale))
+    directions = ('horizontal', 'vertical', 'diagonal1', 'diagonal2')
+
+    def four_convolutions():
+        wide = image.astype(np.int16)
+        return [convolve(wide, kernel) for kernel in sobel_kernels()]
+
+    convolve_time, expected = measure(four_convolutions, repeat=5)
+    print(f"Z11 Sobel, {filename} x{scale}x{scale} {image.shape}")
+    print(f"{'4 x convolve 3x3':>48}: {convolve_time * 1e3:8.2f} ms")
+    for outputs in (directions, directions + ('magnitude', 'orientation'), ('magnitude',)):
+        fused_time, fused = measure(sobel_gradients, image, outputs, repeat=5)
+        identical = all(np.array_equal(fused[name], response)
+                        for name, response in zip(directions, expected) if name in fused)
+        print(f"{', '.join(outputs):>48}: {fused_time * 1e3:8.2f} ms, zgodne: {identical}")
+
+
+# ----------------------------
+# Z8 - lokalna średnia: splot z maską k x k a tablice sum skumulowanych
+# (koszt local_moments nie zależy od rozmiaru maski)
+# ----------------------------
+def benchmark_local_moments(mask_sizes=(9, 13, 17, 21), filename='hidden-symbols.tif', scale=4):
+    from scipy.ndimage import convolve
+    from window_ops import local_moments
+
+    image = np.tile(load_image(filename), (scale, scale))
+    print(f"Z8 lokalne momenty, {filename} x{scale}x{scale} {image.shape}")
+    print(f"{'maska':>7} | {'splot [ms]':>10} | {'średnia [ms]':>12} | {'śr.+wariancja [ms]':>18} | "
+          f"{'+min/max [ms]':>13} | {'maks. różnica':>13}")
+    for size in mask_sizes:
+        kernel = np.ones((size, size)) / (size ** 2)
+        convolve_time, expected = measure(convolve, image.astype(float), kernel, mode='reflect')
+        padded = np.pad(image, size // 2, mode='symmetric')
+        mean_time, moments = measure(local_moments, padded, size, ('mean',), repeat=3)
+        variance_time, _ = measure(local_moments, padded, size, repeat=3)
+        all_time, _ = measure(local_moments, padded, size, ('mean', 'variance', 'min', 'max'), repeat=3)
+        difference = np.abs(moments['mean'] - expected).max()
+        print(f"{size:>3}x{size:<3} | {convolve_time * 1e3:>10.1f} | {mean_time * 1e3:>12.1f} | "
+              f"{variance_time * 1e3:>18.1f} | {all_time * 1e3:>13.1f} | {difference:>13.1e}")
+
+
+# ----------------------------
+# Z8 - adaptacyjne wyrównanie z interpolacją kafelków a dokładne wyrównanie
+# lokalne (przesuwny histogram) dla maski k x k: czas i zgodność wyników
+# (kafelki o boku k, bez obcięcia i z obcięciem histogramu)
+# ----------------------------
+def benchmark_adaptive_equalization(mask_sizes=(9, 13, 17, 21), clip_limits=(None, 2.0)):
+    from Z8 import adaptive_histogram_equalization, local_histogram_equalization
+
+    image = load_image('hidden-symbols.tif')
+    print(f"Z8 wyrównanie adaptacyjne a lokalne, hidden-symbols.tif {image.shape}")
+    print(f"{'maska':>7} | {'obcięcie':>8} | {'dokładne [ms]':>13} | {'kafelki [ms]':>12} | "
+          f"{'śr. |różnica|':>13} | {'PSNR [dB]':>9} | {'korelacja':>9}")
+    for size in mask_sizes:
+        exact_time, exact = measure(local_histogram_equalization, image, size)
+        tile_grid = tuple(max(1, round(length / size)) for length in image.shape)
+        for clip_limit in clip_limits:
+            tiled_time, tiled = measure(adaptive_histogram_equalization, image, tile_grid, clip_limit, repeat=5)
+            difference = tiled.astype(float) - exact
+            psnr = 10 * np.log10(255 ** 2 / max(np.mean(difference ** 2), 1e-12))
+            correlation = np.corrcoef(tiled.ravel(), exact.ravel())[0, 1]
+            print(f"{size:>3}x{size:<3} | {str(clip_limit):>8} | {exact_time * 1e3:>13.1f} | {tiled_time * 1e3:>12.2f} | "
+                  f"{np.abs(difference).mean():>13.2f} | {psnr:>9.1f} | {correlation:>9.4f}")
+
+    large = np.tile(load_image('chest-xray.tif'), (4, 4))
+    tiled_time, _ = measure(adaptive_histogram_equalization, large, (8, 8), 2.0, repeat=3)
+    print(f"chest-xray.tif x4x4 {large.shape}, siatka 8x8: {tiled_time * 1e3:.1f} ms")
+
+
+# ----------------------------
+# Z7 - wyrównanie histogramu stosu klatek: pętla po klatkach z
+# equalize_histogram (bieżąca ścieżka dla pojedynczych obrazów; dla
+# porównania także dawna wersja z np.histogram) a equalize_stack.
+# Przyspieszenie podawane jest względem bieżącej pętli. Syntetyczny film
+# z pout.tif: szum i jasny obiekt pojawiający się w części klatek
+# (migotanie tła po wyrównaniu)
+# ----------------------------
+def benchmark_stack_equalization(frames=200, smoothing=(0.5, 0.2, 0.1)):
+    from histograms import equalization_lut
+    from Z7 import equalize_histogram, equalize_stack
+
+    rng = np.random.default_rng(0)
+    base = load_image('pout.tif')
+    stack = np.clip(base + rng.normal(0, 2, (frames,) + base.shape), 0, 255).astype(np.uint8)
+    stack[rng.random(frames) < 0.3, :100, :120] = 250
+    background = (slice(None), slice(150, None), slice(None))
+
+    def original_loop():
+        equalized = []
+        for frame in stack:
+            hist, _ = np.histogram(frame.flatten(), 256, [0, 256])
+            equalized.append(equalization_lut(hist)[frame])
+        return np.stack(equalized)
+
+    def current_loop():
+        return np.stack([equalize_histogram(frame) for frame in stack])
+
+    def flicker(equalized):
+        return np.std(np.diff(equalized[background].mean(axis=(1, 2))))
+
+    print(f"Z7 wyrównanie stosu klatek, pout.tif x{frames} {stack.shape}")
+    original_time, expected = measure(original_loop, repeat=3)
+    loop_time, looped = measure(current_loop, repeat=3)
+    stack_time, batched = measure(equalize_stack, stack, repeat=3)
+    print(f"pętla, np.histogram (dawna):  {original_time * 1e3:8.1f} ms")
+    print(f"pętla, equalize_histogram:    {loop_time * 1e3:8.1f} ms, zgodne: {np.array_equal(expected, looped)}")
+    print(f"equalize_stack:               {stack_time * 1e3:8.1f} ms, zgodne: {np.array_equal(expected, batched)}, "
+          f"przyspieszenie względem pętli {loop_time / stack_time:.1f}x")
+    print(f"migotanie tła (odch. std. zmian średniej między klatkami): bez wygładzania {flicker(batched):.2f}")
+    for alpha in smoothing:
+        smoothed_time, smoothed = measure(equalize_stack, stack, alpha)
+        print(f"  wygładzanie alfa={alpha}: {flicker(smoothed):6.2f}, {smoothed_time * 1e3:8.1f} ms")
+
+
+# ----------------------------
+# Rysowanie wykresów bez ekranu: wykres porównawczy Z7 (2x2, dpi 300) dla
+# kolejnych obrazów - pyplot z nową figurą dla każdego obrazu (jak dotychczas)
+# a Renderer z rendering.py: figura używana ponownie, zapis w tym samym wątku
+# albo w tle, w czasie wyrównywania kolejnego obrazu
+# Pomiar w osobnym procesie z MPLBACKEND=Agg - backend nie zmienia się dla
+# pozostałych pomiarów uruchomionych w tym samym procesie
+# ----------------------------
+def rendering_child(images=('chest-xray.tif', 'pollen-dark.tif', 'pollen-ligt.tif',
+                            'pollen-lowcontrast.tif', 'pout.tif', 'spectrum.tif'), repeat=2):
+    import tempfile
+    from rendering import Renderer
+    import matplotlib.pyplot as plt
+    from histograms import histogram, plot_histogram
+    from Z7 import equalize_histogram
+
+    originals = [load_image(filename) for filename in images]
+    output_dir = tempfile.TemporaryDirectory()
+
+    def draw(fig, axes, original, equalized):
+        for ax, image in ((axes[0, 0], original), (axes[1, 0], equalized)):
+            ax.imshow(image, cmap='gray', vmin=0, vmax=255)
+            ax.axis('off')
+        plot_histogram(axes[0, 1], histogram(original), color='blue')
+        plot_histogram(axes[1, 1], histogram(equalized), color='green')
+        fig.suptitle('Wyrównanie histogramu')
+        fig.tight_layout(rect=[0, 0, 1, 0.96])
+
+    def with_pyplot():
+        for i, original in enumerate(originals):
+            equalized = equalize_histogram(original)
+            fig, axes = plt.subplots(2, 2, figsize=(12, 8))
+            draw(fig, axes, original, equalized)
+            fig.savefig(os.path.join(output_dir.name, f"pyplot_{i}.png"), dpi=300)
+            plt.close(fig)
+
+    def with_renderer(background):
+        renderer = Renderer(background=background)
+        for i, original in enumerate(originals):
+            equalized = equalize_histogram(original)
+            renderer.render(lambda fig, axes, original=original, equalized=equalized: draw(fig, axes, original, equalized),
+                            os.path.join(output_dir.name, f"renderer_{i}.png"), 2, 2, figsize=(12, 8), dpi=300)
+        renderer.wait()
+
+    print(f"Rysowanie wykresów porównawczych Z7 bez ekranu, {len(images)} obrazów, dpi 300")
+    pyplot_time, _ = measure(with_pyplot, repeat=repeat)
+    reused_time, _ = measure(with_renderer, False, repeat=repeat)
+    background_time, _ = measure(with_renderer, True, repeat=repeat)
+    print(f"pyplot, nowa figura:        {pyplot_time:7.2f} s")
+    print(f"Renderer, ta sama figura:   {reused_time:7.2f} s, przyspieszenie {pyplot_time / reused_time:.2f}x")
+    print(f"Renderer, zapis w tle:      {background_time:7.2f} s, przyspieszenie {pyplot_time / background_time:.2f}x "
+          f"(rdzenie: {os.cpu_count()})")
+    output_dir.cleanup()
+
+
+def benchmark_rendering():
+    import subprocess
+    from rendering import HEADLESS_BACKEND
+    env = dict(os.environ, MPLBACKEND=HEADLESS_BACKEND)
+    output = subprocess.run([sys.executable, __file__, '--rendering'], env=env,
+                            capture_output=True, text=True, check=True).stdout
+    print(output, end='')
+
+
+BENCHMARKS = {
+    'z8_local_equalization': benchmark_local_histogram_equalization,
+    'z9_neighborhood_filters': benchmark_neighborhood_filters,
+    'z10_gaussian_filter': benchmark_gaussian_filter,
+    'z6_intensity_chain': benchmark_intensity_chain,
+    'z12_tiled_bonescan': benchmark_tiled_bonescan,
+    'z11_sharpening_memory': benchmark_sharpening_memory,
+    'z11_sobel': benchmark_sobel,
+    'z8_local_moments': benchmark_local_moments,
+    'z8_adaptive_equalization': benchmark_adaptive_equalization,
+    'z7_stack_equalization': benchmark_stack_equalization,
+    'rendering': benchmark_rendering,
+}
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--sharpening-rss']:
+        sharpening_rss_child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        sys.exit()
+    if sys.argv[1:2] == ['--rendering']:
+        rendering_child()
+        sys.exit()
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        BENCHMARKS[name]()
+        print()
@@ -0,0 +1,108 @@
+import numpy as np
+
+# ----------------------------
+# Gradient Sobela w czterech kierunkach, moduł i kierunek gradientu
+# Zamiast czterech pełnych splotów 3x3 (4 x 9 mnożeń na piksel) obraz jest
+# dopełniany raz, a maski Sobela rozkładane na przesunięcia i sumy:
+# - poziomy  = wygładzenie [1, 2, 1] w kolumnach, różnica w wierszach
+# - pionowy  = różnica w kolumnach, wygładzenie [1, 2, 1] w wierszach
+# - ukośne wynikają z dwóch powyższych:
+#       ukośny 1 = (poziomy + pionowy) / 2 + (p[i+1, j+1] - p[i-1, j-1])
+#       ukośny 2 = (pionowy - poziomy) / 2 + (p[i-1, j+1] - p[i+1, j-1])
+#   (poziomy + pionowy jest zawsze parzysty, więc dzielenie jest dokładne)
+# Liczone są tylko wyniki, o które prosi wywołujący.
+# Obliczenia w typie całkowitym z zapasem (int16 dla uint8), bez przepełnienia;
+# wyniki są identyczne z scipy.ndimage.convolve (tryb 'reflect' scipy to
+# dopełnienie 'symmetric' w np.pad) dla obrazu w typie bez przepełnienia.
+# ----------------------------
+SOBEL_OUTPUTS = ('horizontal', 'vertical', 'diagonal1', 'diagonal2', 'magnitude', 'orientation')
+
+
+# Typ obliczeń: wartości do 8 * maksimum typu wejściowego mieszczą się bez przepełnienia
+def gradient_dtype(dtype):
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.floating):
+        return np.promote_types(dtype, np.float32)
+    if dtype.itemsize == 1:
+        return np.dtype(np.int16)
+    if dtype.itemsize == 2:
+        return np.dtype(np.int32)
+    return np.dtype(np.int64)
+
+
+# ----------------------------
+# image   - obraz 2D
+# outputs - nazwy wyników z SOBEL_OUTPUTS
+# Zwraca słownik {nazwa: tablica}; kierunki w typie gradient_dtype (ze znakiem),
+# moduł (sqrt(poziomy^2 + pionowy^2)) i kierunek (arctan2(pionowy, poziomy),
+# w radianach) w float32
+# ----------------------------
+def sobel_gradients(image, outputs=('horizontal', 'vertical')):
+    unknown = set(outputs) - set(SOBEL_OUTPUTS)
+    if unknown:
+        raise ValueError(f"Nieznane wyniki: {sorted(unknown)}")
+    dtype = gradient_dtype(image.dtype)
+    padded = np.pad(image.astype(dtype, copy=False), 1, mode='symmetric')
+    shape = image.shape
+    results = {}
+
+    need_horizontal = bool(set(outputs) - {'vertical'})
+    need_vertical = bool(set(outputs) - {'horizontal'})
+
+    if need_horizontal:
+        # Wygładzenie [1, 2, 1] w kolumnach, potem różnica wierszy i+1 oraz i-1
+        smooth = np.add(padded[:, :-2], padded[:, 2:])
+        smooth += padded[:, 1:-1]
+        smooth += padded[:, 1:-1]
+        horizontal = np.subtract(smooth[2:], smooth[:-2])
+        del smooth
+        results['horizontal'] = horizontal
+
+    if need_vertical:
+        # Różnica kolumn j+1 oraz j-1, potem wygładzenie [1, 2, 1] w wierszach
+        difference = np.subtract(padded[:, 2:], padded[:, :-2])
+        vertical = np.add(difference[:-2], difference[2:])
+        vertical += difference[1:-1]
+        vertical += difference[1:-1]
+        del difference
+        results['vertical'] = vertical
+
+    integer = np.issubdtype(dtype, np.integer)
+    if 'diagonal1' in outputs:
+        diagonal = np.add(horizontal, vertical)
+        if integer:
+            diagonal //= 2
+        else:
+            diagonal /= 2
+        diagonal += padded[2:, 2:]
+        diagonal -= padded[:-2, :-2]
+        results['diagonal1'] = diagonal
+
+    if 'diagonal2' in outputs:
+        diagonal = np.subtract(vertical, horizontal)
+        if integer:
+            diagonal //= 2
+        else:
+            diagonal /= 2
+        diagonal += padded[:-2, 2:]
+        diagonal -= padded[2:, :-2]
+        results['diagonal2'] = diagonal
+
+    if 'magnitude' in outputs:
+        magnitude = np.empty(shape, dtype=np.float32)
+        np.multiply(horizontal, horizontal, out=magnitude, dtype=np.float32)
+        square = np.multiply(vertical, vertical, dtype=np.float32)
+        magnitude += square
+        del square
+        np.sqrt(magnitude, out=magnitude)
+        results['magnitude'] = magnitude
+
+    if 'orientation' in outputs:
+        results['orientation'] = np.arctan2(vertical, horizontal, dtype=np.float32)
+
+    return {name: results[name] for name in outputs}
+
+
+# Wartość bezwzględna odpowiedzi ograniczona do [0, 255] jako uint8 (do wyświetlania)
+def to_uint8(response):
+    return np.clip(np.abs(response), 0, 255).astype(np.uint8)
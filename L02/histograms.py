@@ -0,0 +1,223 @@
+import weakref
+import numpy as np
+
+# ----------------------------
+# Wspólne liczenie histogramów i dystrybuant (CDF) obrazów
+# Dla obrazów całkowitych bez znaku (uint8, uint16, bool) histogram liczony
+# jest przez np.bincount na spłaszczonym widoku obrazu (bez kopii dla tablic
+# ciągłych) - dokładne zliczanie zamiast przedziałów zmiennoprzecinkowych
+# np.histogram. Pozostałe typy: np.histogram(image, 256, [0, 256]) jak w Z7.
+# Wyniki są zapamiętywane tylko dla obrazów tylko do odczytu (flaga writeable
+# wyłączona dla tablicy i wszystkich tablic bazowych, np. po
+# image.setflags(write=False) albo dla np.memmap w trybie 'r') - zawartości
+# takiego obrazu nie da się zmienić w miejscu, więc wynik nie może być
+# nieaktualny. Dla obrazów zapisywalnych histogram liczony jest za każdym razem.
+# Klucz: obiekt tablicy, adres danych, kształt, kroki; osobno dla każdego
+# obszaru (region) i kanału, więc kolejne wyrównania, rozciągnięcia i wykresy
+# tego samego obrazu nie liczą go ponownie. Wpis znika razem z tablicą (weakref).
+# Zwracane tablice są tylko do odczytu, bo mogą być współdzielone.
+# ----------------------------
+DEFAULT_LEVELS = 256
+
+cache = {}
+stats = {'hits': 0, 'misses': 0, 'uncached': 0}
+
+
+# Liczba poziomów zliczanych przez bincount (None - typ bez szybkiej ścieżki)
+def bincount_levels(dtype):
+    dtype = np.dtype(dtype)
+    if dtype == bool:
+        return 2
+    if np.issubdtype(dtype, np.unsignedinteger) and dtype.itemsize <= 2:
+        return 1 << (8 * dtype.itemsize)
+    return None
+
+
+def signature(image):
+    return (image.__array_interface__['data'][0], image.shape, image.strides, image.dtype.str)
+
+
+# Obszar jako klucz słownika: krotka wycinków -> krotka (start, stop, step)
+def region_key(region):
+    if region is None:
+        return None
+    if not isinstance(region, tuple):
+        region = (region,)
+    return tuple((item.start, item.stop, item.step) if isinstance(item, slice) else item for item in region)
+
+
+# Czy zawartości obrazu nie można zmienić przez żadną z tablic (obraz i jego bazy)
+def is_frozen(image):
+    array = image
+    while isinstance(array, np.ndarray):
+        if array.flags.writeable:
+            return False
+        array = array.base
+    return True
+
+
+def entry(image):
+    key = id(image)
+    cached = cache.get(key)
+    if cached is None or cached['ref']() is not image or cached['signature'] != signature(image):
+        cached = {'ref': weakref.ref(image, lambda _, key=key: cache.pop(key, None)),
+                  'signature': signature(image), 'values': {}}
+        cache[key] = cached
+    return cached['values']
+
+
+def cached(kind, image, region, channel, compute):
+    if not is_frozen(image):
+        stats['uncached'] += 1
+        value = compute()
+        value.setflags(write=False)
+        return value
+    values = entry(image)
+    key = (kind, region_key(region), channel)
+    if key in values:
+        stats['hits'] += 1
+        return values[key]
+    stats['misses'] += 1
+    value = compute()
+    value.setflags(write=False)
+    values[key] = value
+    return value
+
+
+def count(values):
+    levels = bincount_levels(values.dtype)
+    if levels is None:
+        hist, _ = np.histogram(values, DEFAULT_LEVELS, [0, DEFAULT_LEVELS])
+        return hist
+    # Histogram ma co najmniej 256 poziomów, także dla obrazów uint16
+    # o jasnościach mieszczących się w tym zakresie
+    return np.bincount(values.reshape(-1), minlength=min(levels, DEFAULT_LEVELS))
+
+
+# ----------------------------
+# Histogram obrazu
+# region  - obszar obrazu, np. (slice(0, 100), slice(50, 150))
+# channel - numer kanału obrazu (H, W, C); None - wszystkie wartości razem
+# ----------------------------
+def histogram(image, region=None, channel=None):
+    if channel is not None:
+        return channel_histograms(image, region)[channel]
+
+    def compute():
+        values = image if region is None else image[region]
+        return count(values)
+
+    return cached('histogram', image, region, None, compute)
+
+
+# ----------------------------
+# Histogramy wszystkich kanałów obrazu (H, W, C) jednym zliczeniem:
+# wartości kanału c przesunięte o c * liczba poziomów
+# Zwraca tablicę (C, poziomy)
+# ----------------------------
+def channel_histograms(image, region=None):
+    def compute():
+        values = image if region is None else image[region]
+        channels = values.shape[-1]
+        levels = bincount_levels(values.dtype)
+        if levels is None:
+            return np.stack([count(values[..., channel]) for channel in range(channels)])
+        levels = max(min(levels, DEFAULT_LEVELS), int(values.max()) + 1) if values.size else levels
+        offsets = np.arange(channels, dtype=np.intp) * levels
+        shifted = values.reshape(-1, channels) + offsets
+        return np.bincount(shifted.reshape(-1), minlength=channels * levels).reshape(channels, levels)
+
+    return cached('channels', image, region, None, compute)
+
+
+# ----------------------------
+# Histogramy wszystkich klatek stosu (klatki, H, W) uint8 jako tablica (klatki, 256)
+# Każda klatka zliczana jest osobnym bincount na widoku uint8. bincount zamienia
+# indeksy na intp, więc kopia ma rozmiar jednej klatki (mieści się w pamięci
+# podręcznej procesora) - jedno zliczenie całego stosu z jasnościami
+# przesuniętymi o klatka * 256 jest przez tę kopię (8 bajtów na piksel stosu)
+# ok. 2-3 razy wolniejsze.
+# ----------------------------
+def stack_histograms(stack):
+    if stack.dtype != np.uint8:
+        raise TypeError(f"Stos klatek musi być uint8, a jest {stack.dtype}")
+
+    def compute():
+        counts = np.empty((stack.shape[0], DEFAULT_LEVELS), dtype=np.intp)
+        for frame, values in enumerate(stack):
+            counts[frame] = np.bincount(values.reshape(-1), minlength=DEFAULT_LEVELS)
+        return counts
+
+    return cached('stack', stack, None, None, compute)
+
+
+# Dystrybuanta (skumulowany histogram)
+def cdf(image, region=None, channel=None):
+    return cached('cdf', image, region, channel,
+                  lambda: histogram(image, region, channel).cumsum(axis=-1))
+
+
+# ----------------------------
+# Tablica przekształcenia (LUT) wyrównującego histogram
+# hist - histogram 256 poziomów (liczby pikseli, mogą być ułamkowe,
+#        np. po obcięciu i rozdzieleniu nadmiaru w CLAHE z Z8)
+# Dla tablicy histogramów (..., 256) zwraca tablicę LUT (..., 256)
+# Zwraca LUT uint8: poziom jasności -> poziom po wyrównaniu
+# ----------------------------
+def equalization_lut(hist):
+    # Obliczenie dystrybuanty (CDF) histogramu
+    cumulative = hist.cumsum(axis=-1)
+
+    # Maskowanie zer (żeby nie dzielić przez zero)
+    cdf_masked = np.ma.masked_equal(cumulative, 0)
+
+    # Minimalna i maksymalna wartość CDF (poza zerami)
+    cdf_min = cdf_masked.min(axis=-1, keepdims=True)
+    cdf_max = cdf_masked.max(axis=-1, keepdims=True)
+
+    # Normalizacja CDF do zakresu [0,255]
+    cdf_masked = (cdf_masked - cdf_min) * 255 / (cdf_max - cdf_min)
+
+    # Wypełnienie zamaskowanych miejsc zerami i konwersja na uint8
+    return np.ma.filled(cdf_masked, 0).astype('uint8')
+
+
+# Najmniejsza i największa jasność obrazu odczytane z histogramu
+def min_max(image, region=None, channel=None):
+    if bincount_levels(image.dtype) is None:
+        values = image if region is None else image[region]
+        if channel is not None:
+            values = values[..., channel]
+        return np.min(values), np.max(values)
+    occupied = np.flatnonzero(histogram(image, region, channel))
+    if not len(occupied):
+        raise ValueError("Nie można wyznaczyć zakresu jasności pustego obrazu")
+    return image.dtype.type(occupied[0]), image.dtype.type(occupied[-1])
+
+
+# Słupki histogramu na osi wykresu
+# data_range=False - jak ax.hist(image.ravel(), bins, range=(0, bins))
+# data_range=True  - jak ax.hist(image.ravel(), bins) bez range: przedziały
+#                    rozpięte od najmniejszej do największej jasności obrazu
+def plot_histogram(ax, hist, data_range=False, **kwargs):
+    levels = len(hist)
+    value_range = (0, levels)
+    occupied = np.flatnonzero(hist)
+    if data_range and len(occupied):
+        value_range = (occupied[0], occupied[-1])
+    return ax.hist(np.arange(levels), bins=levels, range=value_range, weights=hist, **kwargs)
+
+
+def invalidate(image):
+    cache.pop(id(image), None)
+
+
+def cache_info():
+    return {'hits': stats['hits'], 'misses': stats['misses'], 'uncached': stats['uncached'], 'size': len(cache)}
+
+
+def clear_cache():
+    cache.clear()
+    stats['hits'] = 0
+    stats['misses'] = 0
+    stats['uncached'] = 0
@@ -0,0 +1,81 @@
+import functools
+import inspect
+from collections import OrderedDict
+import numpy as np
+
+# ----------------------------
+# Wspólna pamięć podręczna (LRU) dla masek i jąder filtrów
+# Funkcje budujące jądra (np. gaussian_kernel z Z10, maski Sobela z Z11)
+# oznaczane są dekoratorem @cached_kernel. Wynik jest zapamiętywany pod
+# kluczem (nazwa funkcji, parametry) we wspólnej, ograniczonej pamięci -
+# najdawniej używane wpisy są usuwane po przekroczeniu MAX_ENTRIES.
+# Parametry są dopasowywane do sygnatury funkcji razem z wartościami
+# domyślnymi, więc f(5), f(5, 1.0) i f(5, sigma=1.0) to ten sam wpis.
+# Listy i słowniki w parametrach zamieniane są na krotki.
+# Zwracane tablice są tylko do odczytu, bo są współdzielone między wywołaniami.
+# ----------------------------
+MAX_ENTRIES = 256
+
+cache = OrderedDict()
+stats = {'hits': 0, 'misses': 0}
+
+
+def freeze(value):
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            freeze(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            freeze(item)
+    return value
+
+
+# Parametr jako część klucza słownika
+def hashable(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(hashable(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, hashable(item)) for key, item in value.items()))
+    if isinstance(value, np.ndarray):
+        return (value.dtype.str, value.shape, value.tobytes())
+    return value
+
+
+def cached_kernel(function):
+    name = f"{function.__module__}.{function.__qualname__}"
+    signature = inspect.signature(function)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (name, hashable(tuple(bound.arguments.items())))
+        if key in cache:
+            stats['hits'] += 1
+            cache.move_to_end(key)
+            return cache[key]
+
+        stats['misses'] += 1
+        value = freeze(function(*args, **kwargs))
+        cache[key] = value
+        if len(cache) > MAX_ENTRIES:
+            cache.popitem(last=False)
+        return value
+
+    return wrapper
+
+
+# ----------------------------
+# Statystyki pamięci podręcznej: trafienia, chybienia, liczba wpisów
+# ----------------------------
+def cache_info():
+    return {'hits': stats['hits'], 'misses': stats['misses'],
+            'size': len(cache), 'maxsize': MAX_ENTRIES}
+
+
+def clear_cache():
+    cache.clear()
+    stats['hits'] = 0
+    stats['misses'] = 0
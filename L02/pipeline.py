@@ -0,0 +1,177 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict, namedtuple
+import numpy as np
+
+# ----------------------------
+# Leniwy potok przetwarzania obrazu jako graf nazwanych etapów
+# Etap to funkcja, jej parametry i nazwy etapów wejściowych. Wynik etapu
+# liczony jest dopiero na żądanie (compute) i zapamiętywany w pamięci
+# podręcznej pod kluczem wyznaczonym z:
+# - skrótu obrazu wejściowego (dla źródła),
+# - nazwy i parametrów etapu oraz kluczy jego wejść (dla pozostałych).
+# - odcisku kodu funkcji etapu (kod bajtowy, stałe i użyte nazwy) oraz
+#   opcjonalnej wersji etapu - po zmianie funkcji wyniki z DiskCache nie są
+#   używane ponownie. Zmiana funkcji pomocniczych wywoływanych przez etap nie
+#   zmienia odcisku; wtedy należy podnieść version przy stage().
+# Klucz nie wymaga liczenia wyników, więc po zmianie parametru jednego etapu
+# liczony jest od nowa tylko ten etap i etapy za nim - wcześniejsze są
+# brane z pamięci podręcznej (albo w ogóle pomijane, jeśli trafiony jest
+# już etap późniejszy).
+# Wyniki etapów są tylko do odczytu - są współdzielone przez pamięć podręczną.
+# ----------------------------
+
+# Wpis dziennika wykonania: nazwa etapu, czas [s], trafienie w pamięci podręcznej
+StageRun = namedtuple('StageRun', ['name', 'seconds', 'hit'])
+
+Stage = namedtuple('Stage', ['function', 'inputs', 'params', 'version'])
+
+
+# Odcisk kodu funkcji (razem z kodem funkcji zagnieżdżonych i lambd)
+def code_fingerprint(function):
+    code = getattr(function, '__code__', None)
+    if code is None:
+        # Funkcje bez kodu Pythona (np. z bibliotek w C) - tylko nazwa
+        return repr(function)
+    digest = hashlib.sha1()
+
+    def update(code):
+        digest.update(code.co_code)
+        digest.update(repr(code.co_names).encode())
+        for constant in code.co_consts:
+            if hasattr(constant, 'co_code'):
+                update(constant)
+            else:
+                digest.update(repr(constant).encode())
+
+    update(code)
+    return digest.hexdigest()
+
+
+def array_hash(image):
+    digest = hashlib.sha1()
+    digest.update(f"{image.dtype.str}{image.shape}".encode())
+    digest.update(memoryview(np.ascontiguousarray(image)).cast('B'))
+    return digest.hexdigest()
+
+
+# ----------------------------
+# Pamięć podręczna w RAM - najdawniej używane wyniki usuwane po max_entries
+# ----------------------------
+class MemoryCache:
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, value):
+        self.entries[key] = value
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+# ----------------------------
+# Pamięć podręczna na dysku - każdy wynik w osobnym pliku <klucz>.npy
+# (wyniki zostają między uruchomieniami programu)
+# ----------------------------
+class DiskCache:
+    def __init__(self, directory='./.pipeline-cache'):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def get(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode='r')
+
+    def put(self, key, value):
+        # Zapis do pliku tymczasowego i zamiana - przerwany zapis nie zostawia uszkodzonego wpisu
+        temporary = self.path(f"{key}.tmp")
+        np.save(temporary, value)
+        os.replace(temporary, self.path(key))
+
+
+class Pipeline:
+    def __init__(self, cache=None):
+        self.cache = MemoryCache() if cache is None else cache
+        self.sources = {}
+        self.stages = OrderedDict()
+        self.log = []
+        self.logged = set()
+
+    # Obraz wejściowy (klucz to skrót jego zawartości)
+    def source(self, name, image):
+        self.sources[name] = (image, array_hash(image))
+        return self
+
+    # Etap name = function(*wyniki etapów inputs, **params)
+    # version - dowolna wartość zmieniana ręcznie, gdy zmienia się wynik etapu
+    #           bez zmiany kodu samej funkcji (np. w funkcjach pomocniczych)
+    def stage(self, name, function, inputs, version=None, **params):
+        if isinstance(inputs, str):
+            inputs = (inputs,)
+        self.stages[name] = Stage(function, tuple(inputs), params, version)
+        return self
+
+    # Zmiana parametrów etapu (pozostałe parametry bez zmian)
+    def set_params(self, name, **params):
+        stage = self.stages[name]
+        self.stages[name] = stage._replace(params={**stage.params, **params})
+        return self
+
+    def key(self, name):
+        if name in self.sources:
+            return self.sources[name][1]
+        stage = self.stages[name]
+        function = stage.function
+        description = repr((name, getattr(function, '__module__', None), getattr(function, '__qualname__', None),
+                            code_fingerprint(function), stage.version,
+                            sorted(stage.params.items()), [self.key(input) for input in stage.inputs]))
+        return hashlib.sha1(description.encode()).hexdigest()
+
+    # Wynik etapu - z pamięci podręcznej albo liczony (razem z brakującymi wejściami)
+    def compute(self, name):
+        if name in self.sources:
+            return self.sources[name][0]
+        key = self.key(name)
+        start = time.perf_counter()
+        result = self.cache.get(key)
+        if result is not None:
+            # Ponowne pobranie etapu w tym samym przebiegu (np. jako wejście
+            # kolejnego etapu) nie jest liczone jako kolejne trafienie
+            if name not in self.logged:
+                self.logged.add(name)
+                self.log.append(StageRun(name, time.perf_counter() - start, True))
+            return result
+
+        stage = self.stages[name]
+        inputs = [self.compute(input) for input in stage.inputs]
+        start = time.perf_counter()
+        result = stage.function(*inputs, **stage.params)
+        if isinstance(result, np.ndarray):
+            result.setflags(write=False)
+        self.logged.add(name)
+        self.log.append(StageRun(name, time.perf_counter() - start, False))
+        self.cache.put(key, result)
+        return result
+
+    # Czasy etapów i trafienia od ostatniego reset_log() - każdy etap raz
+    def report(self):
+        for run in self.log:
+            print(f"{run.name:<20} {run.seconds * 1e3:9.2f} ms  {'z pamięci' if run.hit else 'liczony'}")
+        hits = sum(run.hit for run in self.log)
+        print(f"Trafienia: {hits}/{len(self.log)}, łączny czas: {sum(run.seconds for run in self.log) * 1e3:.2f} ms")
+
+    def reset_log(self):
+        self.log = []
+        self.logged = set()
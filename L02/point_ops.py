@@ -0,0 +1,115 @@
+import numpy as np
+
+# ----------------------------
+# Operacje punktowe (przekształcenia jasności piksel po pikselu) jako LUT
+# Dla obrazów całkowitych (uint8, uint16, int8, int16) funkcja skalarna jest
+# stablicowana raz dla wszystkich możliwych poziomów typu wejściowego,
+# a obraz przekształcany jest jednym indeksowaniem tablicy (lut[image]).
+# Kilka operacji łączonych metodą then() składa się w jedną tablicę,
+# więc cały łańcuch to nadal jeden przebieg po obrazie.
+# Funkcje mogą być skalarne (dostają liczbę Pythona) albo wektorowe
+# (vectorized=True - dostają tablicę poziomów typu wejściowego, jak obraz).
+# Dla obrazów zmiennoprzecinkowych funkcje wykonywane są dla każdego piksela.
+# ----------------------------
+
+# Największy typ, dla którego opłaca się budować pełną tablicę (65536 poziomów)
+MAX_LUT_ITEMSIZE = 2
+
+
+# Wszystkie poziomy typu całkowitego, w kolejności odpowiadającej indeksom LUT
+def dtype_levels(dtype):
+    info = np.iinfo(dtype)
+    return np.arange(info.min, info.max + 1, dtype=dtype)
+
+
+# Indeksy LUT dla tablicy wartości typu całkowitego
+def lut_index(values):
+    offset = np.iinfo(values.dtype).min
+    if offset == 0:
+        return values
+    return values.astype(np.intp) - offset
+
+
+# Liczba pikseli przetwarzanych naraz przy nakładaniu LUT
+LUT_BLOCK = 1 << 14
+
+
+# Nałożenie tablicy lut na obraz (indeksy całkowite) z zapisem do out
+# np.take zamienia indeksy na intp, więc obraz dzielony jest na bloki -
+# dodatkowa pamięć to jeden blok zamiast 8 bajtów na każdy piksel obrazu
+def apply_lut(lut, indices, out=None):
+    if out is None:
+        out = np.empty(indices.shape, dtype=lut.dtype)
+    flat_indices = indices.reshape(-1)
+    flat_out = out.reshape(-1)
+    if not np.shares_memory(flat_out, out):
+        # Bufor nieciągły - zapis przez zwykłe indeksowanie
+        out[...] = lut[indices]
+        return out
+    for start in range(0, flat_indices.size, LUT_BLOCK):
+        block = slice(start, start + LUT_BLOCK)
+        np.take(lut, flat_indices[block], out=flat_out[block])
+    return out
+
+
+def supports_lut(dtype):
+    dtype = np.dtype(dtype)
+    return np.issubdtype(dtype, np.integer) and dtype.itemsize <= MAX_LUT_ITEMSIZE
+
+
+# Wartości funkcji dla wszystkich poziomów typu dtype - funkcja dostaje liczby
+# Pythona (jak w range(256)) albo, przy vectorized=True, całą tablicę poziomów
+# typu dtype; wynik jest rzutowany na out_dtype
+def tabulate(function, dtype, out_dtype=np.uint8, vectorized=False):
+    levels = dtype_levels(dtype)
+    if vectorized:
+        return np.asarray(function(levels)).astype(out_dtype)
+    return np.array([function(level) for level in levels.tolist()]).astype(out_dtype)
+
+
+class PointOperation:
+    # functions - jedna lub kilka funkcji skalarnych wykonywanych po kolei
+    # out_dtype - typ wyniku każdego kroku (domyślnie uint8, jak w Z5/Z6)
+    # vectorized - funkcje działają na całych tablicach (patrz tabulate)
+    def __init__(self, *functions, out_dtype=np.uint8, vectorized=False):
+        if not functions:
+            raise ValueError("Operacja punktowa wymaga co najmniej jednej funkcji")
+        self.steps = [(function, np.dtype(out_dtype), vectorized) for function in functions]
+        self.luts = {}
+
+    # Nowa operacja: bieżący łańcuch, a po nim kolejna funkcja
+    def then(self, function, out_dtype=np.uint8, vectorized=False):
+        chained = PointOperation(function, out_dtype=out_dtype, vectorized=vectorized)
+        chained.steps = self.steps + chained.steps
+        return chained
+
+    @property
+    def out_dtype(self):
+        return self.steps[-1][1]
+
+    # Złożona tablica całego łańcucha dla danego typu wejściowego (liczona raz)
+    def lut(self, dtype):
+        dtype = np.dtype(dtype)
+        if dtype not in self.luts:
+            table = dtype_levels(dtype)
+            for function, out_dtype, vectorized in self.steps:
+                if not supports_lut(table.dtype):
+                    raise TypeError(f"Nie można złożyć LUT dla typu pośredniego {table.dtype}")
+                table = tabulate(function, table.dtype, out_dtype, vectorized)[lut_index(table)]
+            self.luts[dtype] = table
+        return self.luts[dtype]
+
+    def __call__(self, image, out=None):
+        image = np.asarray(image)
+        if supports_lut(image.dtype) and all(supports_lut(dtype) for _, dtype, _ in self.steps[:-1]):
+            return apply_lut(self.lut(image.dtype), lut_index(image), out=out)
+
+        # Obrazy zmiennoprzecinkowe - funkcja wywoływana dla każdego piksela
+        result = image
+        for function, out_dtype, vectorized in self.steps:
+            result = (function(result) if vectorized else np.vectorize(function)(result)).astype(out_dtype)
+        if out is not None:
+            out[...] = result
+            return out
+        return result
+
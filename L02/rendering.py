@@ -0,0 +1,132 @@
+import atexit
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import matplotlib
+from matplotlib.figure import Figure
+
+# ----------------------------
+# Wybór backendu Matplotlib
+# TkAgg (okna z wykresami) tylko wtedy, gdy jest dostępny ekran, w przeciwnym
+# razie Agg - wykresy są wtedy tylko zapisywane do plików (np. na serwerach
+# bez X11 i w procesach roboczych batch.py). Zmienna środowiskowa MPLBACKEND
+# ma pierwszeństwo, tak jak w samym Matplotlib.
+# ----------------------------
+INTERACTIVE_BACKEND = 'TkAgg'
+HEADLESS_BACKEND = 'Agg'
+
+
+def has_display():
+    if sys.platform in ('win32', 'darwin'):
+        return True
+    return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+
+def select_backend():
+    if os.environ.get('MPLBACKEND'):
+        backend = os.environ['MPLBACKEND']
+    elif has_display():
+        backend = INTERACTIVE_BACKEND
+    else:
+        backend = HEADLESS_BACKEND
+    matplotlib.use(backend)
+    return backend
+
+
+NON_INTERACTIVE_BACKENDS = ('agg', 'pdf', 'ps', 'svg', 'pgf', 'cairo', 'template')
+
+
+def is_interactive():
+    return matplotlib.get_backend().lower() not in NON_INTERACTIVE_BACKENDS
+
+
+# ----------------------------
+# Rysowanie wykresów porównawczych do plików
+# Funkcja rysująca draw(fig, axes) dostaje figurę z siatką osi nrows x ncols
+# (axes jak z plt.subplots). Bez ekranu (Agg):
+# - figury o tym samym rozmiarze są używane ponownie (fig.clear() i nowa
+#   siatka osi), zamiast tworzyć nowe dla każdego obrazu,
+# - przy background=True rysowanie i zapis wykonuje osobny wątek, a program
+#   w tym czasie liczy kolejny obraz; tablice przekazane do draw nie mogą
+#   być potem zmieniane w miejscu. wait() czeka na wszystkie zlecenia
+#   i zgłasza pierwszy błąd.
+# Z ekranem (TkAgg) wykres rysowany jest od razu i wyświetlany (plt.show()),
+# jak dotychczas.
+# ----------------------------
+class Renderer:
+    def __init__(self, background=None):
+        self.interactive = is_interactive()
+        if background is None:
+            background = not self.interactive
+        # Okien GUI nie można obsługiwać z innego wątku
+        self.executor = ThreadPoolExecutor(max_workers=1) if background and not self.interactive else None
+        self.figures = {}
+        self.pending = []
+
+    def figure(self, nrows, ncols, figsize):
+        if self.interactive:
+            import matplotlib.pyplot as plt
+            fig = plt.figure(figsize=figsize)
+            return fig, fig.subplots(nrows, ncols)
+        key = (nrows, ncols, tuple(figsize))
+        if key not in self.figures:
+            self.figures[key] = Figure(figsize=figsize)
+        fig = self.figures[key]
+        # Usunięcie osi, tytułu i pozostałych elementów poprzedniego wykresu
+        fig.clear()
+        return fig, fig.subplots(nrows, ncols)
+
+    def draw(self, draw, output_path, nrows, ncols, figsize, dpi, message):
+        fig, axes = self.figure(nrows, ncols, figsize)
+        draw(fig, axes)
+        if output_path:
+            fig.savefig(output_path, dpi=dpi if dpi is not None else 'figure')
+            if message:
+                print(message)
+        if self.interactive:
+            import matplotlib.pyplot as plt
+            plt.show()
+            plt.close(fig)
+
+    # output_path - plik wynikowy (None - tylko wyświetlenie, gdy jest ekran)
+    # message     - tekst wypisywany po zapisie pliku
+    def render(self, draw, output_path=None, nrows=1, ncols=1, figsize=(12, 6), dpi=None, message=None):
+        if not output_path and not self.interactive:
+            return None
+        if self.executor is None:
+            self.draw(draw, output_path, nrows, ncols, figsize, dpi, message)
+            return None
+        future = self.executor.submit(self.draw, draw, output_path, nrows, ncols, figsize, dpi, message)
+        self.pending.append(future)
+        return future
+
+    def wait(self):
+        pending, self.pending = self.pending, []
+        for future in pending:
+            future.result()
+
+
+renderer = None
+
+
+# Wspólny obiekt rysujący (tworzony przy pierwszym użyciu, po wyborze backendu)
+def get_renderer():
+    global renderer
+    if renderer is None:
+        renderer = Renderer()
+    return renderer
+
+
+# Oczekiwanie na wykresy rysowane w tle (wywoływane też przy końcu programu)
+def wait_for_rendering():
+    if renderer is not None:
+        renderer.wait()
+
+
+# Nowy obiekt rysujący, np. w procesie potomnym (wątek rodzica nie istnieje po fork)
+def reset_renderer():
+    global renderer
+    renderer = None
+
+
+atexit.register(wait_for_rendering)
@@ -0,0 +1,59 @@
+import numpy as np
+from scipy.ndimage import convolve, gaussian_filter
+
+# ----------------------------
+# Wyostrzanie obrazu (unsharp mask, high boost, Laplasjan) w float32
+# Obliczenia na uint8 przepełniały się: image - blurred dla pikseli
+# ciemniejszych od rozmycia dawało wartości zawinięte do 255 zamiast ujemnych,
+# a każdy krok tworzył nową tablicę float64 wielkości obrazu.
+# Tutaj wszystkie kroki wykonywane są w miejscu na dwóch buforach float32
+# (obraz roboczy i rozmycie / Laplasjan), przydzielanych raz i używanych
+# ponownie przy kolejnych wywołaniach dla obrazów tego samego rozmiaru.
+# Wynik uint8 (obcięty do [0, 255]) zapisywany jest do out.
+# Jedna instancja nie powinna być używana jednocześnie z kilku wątków.
+# ----------------------------
+class SharpeningEngine:
+    def __init__(self):
+        self.work = None
+        self.detail = None
+
+    # Bufory robocze dla danego kształtu (nowe tylko przy zmianie rozmiaru)
+    def buffers(self, shape):
+        if self.work is None or self.work.shape != shape:
+            self.work = np.empty(shape, dtype=np.float32)
+            self.detail = np.empty(shape, dtype=np.float32)
+        return self.work, self.detail
+
+    # Zapis wyniku: obcięcie do [0, 255] i rzutowanie na uint8 (jak astype w Z11/Z12)
+    def finish(self, work, out):
+        np.clip(work, 0, 255, out=work)
+        if out is None:
+            out = np.empty(work.shape, dtype=np.uint8)
+        np.copyto(out, work, casting='unsafe')
+        return out
+
+    # Unsharp mask: image + k * (image - gauss(image)); k > 1 to high boost
+    def unsharp(self, image, sigma=1.0, k=1.0, out=None):
+        work, detail = self.buffers(image.shape)
+        np.copyto(work, image)
+        gaussian_filter(work, sigma=sigma, output=detail)
+        np.subtract(work, detail, out=detail)  # maska
+        detail *= k
+        work += detail
+        return self.finish(work, out)
+
+    def high_boost(self, image, sigma=1.0, k=2.0, out=None):
+        return self.unsharp(image, sigma=sigma, k=k, out=out)
+
+    # Wyostrzanie Laplasjanem: image + convolve(image, kernel)
+    # (kernel z dodatnim środkiem, np. laplacian_kernel z Z11)
+    def laplacian(self, image, kernel, out=None):
+        work, detail = self.buffers(image.shape)
+        np.copyto(work, image)
+        convolve(work, np.asarray(kernel, dtype=np.float32), output=detail)
+        work += detail
+        return self.finish(work, out)
+
+
+# Wspólna instancja dla funkcji z Z11 i Z12
+SHARPENING = SharpeningEngine()
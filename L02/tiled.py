@@ -0,0 +1,148 @@
+import os
+import warnings
+import numpy as np
+from PIL import Image
+
+try:
+    import tifffile
+except ImportError:  # tifffile jest opcjonalny - bez niego TIFF nie jest czytany ani zapisywany kafelkami
+    tifffile = None
+
+# ----------------------------
+# Przetwarzanie dużych obrazów kafelkami (poza pamięcią operacyjną)
+# Obraz czytany jest fragmentami (kafelkami) powiększonymi z każdej strony
+# o zakładkę (halo) równą promieniowi filtru. Filtr liczony jest dla całego
+# fragmentu, a do wyniku trafia tylko środek kafelka - wartości przy brzegach
+# fragmentu, które zależą od sąsiadów spoza niego, są odrzucane. Przy brzegach
+# obrazu fragment kończy się na brzegu, więc filtr dopełnia go tak samo jak
+# cały obraz. Wynik jest identyczny jak przy przetwarzaniu całego obrazu,
+# bez szwów na granicach kafelków.
+# Dla łańcucha filtrów zakładka to suma promieni wszystkich etapów.
+# ----------------------------
+TILE_SIZE = 1024
+
+
+# Promień filtru medianowego / min / max o oknie size x size
+def window_radius(size):
+    return size // 2
+
+
+# Promień filtru Gaussa ze scipy.ndimage (domyślne truncate=4.0)
+def gaussian_radius(sigma, truncate=4.0):
+    return int(truncate * float(sigma) + 0.5)
+
+
+# ----------------------------
+# Źródło obrazu, z którego można czytać fragmenty (indeksowanie [y0:y1, x0:x1])
+# - tablica NumPy lub np.memmap - bez zmian
+# - plik .npy - otwierany przez np.load(mmap_mode='r')
+# - plik TIFF - przez tifffile.memmap (nieskompresowany TIFF, bez wczytywania
+#   całości); bez tifffile, dla TIFF skompresowanego i innych formatów obraz
+#   wczytywany jest w całości przez PIL, z ostrzeżeniem RuntimeWarning -
+#   przetwarzanie nie jest wtedy poza pamięcią
+# ----------------------------
+def open_source(source):
+    if not isinstance(source, (str, os.PathLike)):
+        return source
+    extension = os.path.splitext(str(source))[1].lower()
+    if extension == '.npy':
+        return np.load(source, mmap_mode='r')
+    if extension not in ('.tif', '.tiff'):
+        reason = f"format {extension} nie pozwala czytać fragmentów"
+    elif tifffile is None:
+        reason = "brak pakietu tifffile"
+    else:
+        try:
+            return tifffile.memmap(source, mode='r')
+        except ValueError as error:
+            reason = f"tifffile.memmap: {error}"
+    warnings.warn(f"{source} wczytywany w całości do pamięci ({reason})", RuntimeWarning, stacklevel=2)
+    return np.array(Image.open(source).convert('L'))
+
+
+# Fragment w skali szarości (konwersja jak Image.convert('L') w zadaniach)
+def read_tile(source, rows, cols):
+    tile = np.asarray(source[rows, cols])
+    if tile.ndim == 3:
+        tile = np.array(Image.fromarray(tile).convert('L'))
+    return tile
+
+
+# ----------------------------
+# Tablica wynikowa zapisywana na dysk w trakcie przetwarzania
+# path=None    - zwykła tablica w pamięci
+# path='*.tif' - TIFF mapowany w pamięci (wymaga tifffile)
+# path='*.npy' - plik .npy (np.lib.format.open_memmap)
+# Inne rozszerzenia (i .tif bez tifffile) są błędem - plik wynikowy zawsze
+# ma podaną nazwę
+# ----------------------------
+def create_output(path, shape, dtype=np.uint8):
+    if path is None:
+        return np.empty(shape, dtype=dtype)
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension in ('.tif', '.tiff'):
+        if tifffile is None:
+            raise ImportError(f"Zapis {path} kafelkami wymaga pakietu tifffile (albo ścieżki .npy)")
+        return tifffile.memmap(path, shape=shape, dtype=dtype)
+    if extension != '.npy':
+        raise ValueError(f"Nieobsługiwany format pliku wynikowego {path} (.npy lub .tif)")
+    return np.lib.format.open_memmap(path, mode='w+', shape=shape, dtype=dtype)
+
+
+# Plik dla jednego z wyników funkcji zwracającej słownik, np. wynik_Sobel_poziomy.npy
+def output_key_path(path, key):
+    base, extension = os.path.splitext(path)
+    return f"{base}_{key.replace(' ', '_')}{extension}"
+
+
+# Kolejne kafelki: (wycinek kafelka, wycinek z zakładką) dla jednej osi
+def tile_ranges(length, tile_size, halo):
+    for start in range(0, length, tile_size):
+        stop = min(start + tile_size, length)
+        yield slice(start, stop), slice(max(start - halo, 0), min(stop + halo, length))
+
+
+def tiles(shape, tile_size=TILE_SIZE, halo=0):
+    for rows, halo_rows in tile_ranges(shape[0], tile_size, halo):
+        for cols, halo_cols in tile_ranges(shape[1], tile_size, halo):
+            yield (rows, cols), (halo_rows, halo_cols)
+
+
+# ----------------------------
+# Wykonanie funkcji filtrującej kafelkami
+# function - funkcja obrazu zwracająca tablicę tego samego rozmiaru
+#            albo słownik takich tablic (np. sobel_edges z Z11)
+# halo     - zakładka w pikselach (suma promieni filtrów w funkcji)
+# out      - tablica wynikowa (lub słownik tablic); domyślnie tworzona
+#            przez create_output(output_path, ...) po pierwszym kafelku
+# ----------------------------
+def process_tiled(source, function, halo, out=None, output_path=None, tile_size=TILE_SIZE):
+    source = open_source(source)
+    shape = source.shape[:2]
+    for (rows, cols), (halo_rows, halo_cols) in tiles(shape, tile_size, halo):
+        result = function(read_tile(source, halo_rows, halo_cols))
+        inner = (slice(rows.start - halo_rows.start, rows.stop - halo_rows.start),
+                 slice(cols.start - halo_cols.start, cols.stop - halo_cols.start))
+        if isinstance(result, dict):
+            if out is None:
+                out = {key: create_output(output_path and output_key_path(output_path, key), shape, value.dtype)
+                       for key, value in result.items()}
+            for key, value in result.items():
+                out[key][rows, cols] = value[inner]
+        else:
+            if out is None:
+                out = create_output(output_path, shape, result.dtype)
+            out[rows, cols] = result[inner]
+    return out
+
+
+# Minimum i maksimum całego obrazu liczone kafelkami (bez zakładki)
+def tiled_min_max(source, tile_size=TILE_SIZE):
+    source = open_source(source)
+    minimum = maximum = None
+    for (rows, cols), _ in tiles(source.shape[:2], tile_size):
+        tile = read_tile(source, rows, cols)
+        tile_min, tile_max = tile.min(), tile.max()
+        minimum = tile_min if minimum is None else min(minimum, tile_min)
+        maximum = tile_max if maximum is None else max(maximum, tile_max)
+    return minimum, maximum
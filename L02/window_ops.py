@@ -0,0 +1,168 @@
+import numpy as np
+from scipy.ndimage import median_filter
+
+# ----------------------------
+# Wektorowe operacje na oknach kwadratowych (k x k)
+# Wszystkie funkcje przyjmują obraz już dopełniony o k//2 pikseli z każdej
+# strony (np. np.pad(image, k // 2, mode='reflect')) i zwracają wynik
+# o rozmiarze oryginalnego obrazu - tak jak pętle w Z9.
+# ----------------------------
+
+
+# ----------------------------
+# Suma w oknie k x k z tablicy sum skumulowanych (summed-area table)
+# padded - dopełniony obraz
+# size - rozmiar okna k
+# Zwraca sumy jako int64 (dla obrazów całkowitych wynik jest dokładny)
+# ----------------------------
+def box_sum(padded, size):
+    dtype = np.int64 if np.issubdtype(padded.dtype, np.integer) or padded.dtype == bool else np.float64
+    # Tablica sum z dodatkowym zerowym wierszem i kolumną na początku
+    table = np.zeros((padded.shape[0] + 1, padded.shape[1] + 1), dtype=dtype)
+    np.cumsum(padded, axis=0, dtype=dtype, out=table[1:, 1:])
+    np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+
+    height = padded.shape[0] - size + 1
+    width = padded.shape[1] - size + 1
+    return (table[size:size + height, size:size + width]
+            - table[:height, size:size + width]
+            - table[size:size + height, :width]
+            + table[:height, :width])
+
+
+# ----------------------------
+# Suma w oknie k x k jako dwa przebiegi przesuniętych dodawań (O(k) na piksel)
+# Przy małych k szybsza od tablicy sum skumulowanych, bo działa na wąskim
+# typie akumulatora (dtype) - np. uint16 do zliczania pikseli w oknie.
+# ----------------------------
+def running_sum(padded, size, dtype=np.uint16):
+    height = padded.shape[0] - size + 1
+    width = padded.shape[1] - size + 1
+
+    columns = padded[:height].astype(dtype)
+    for offset in range(1, size):
+        columns += padded[offset:offset + height]
+
+    result = columns[:, :width].copy()
+    for offset in range(1, size):
+        result += columns[:, offset:offset + width]
+    return result
+
+
+# ----------------------------
+# Minimum/maksimum w oknie długości k wzdłuż jednej osi (van Herk / Gil-Werman)
+# Sygnał dzielony jest na bloki długości k, w każdym liczone są maksima
+# narastające od lewej (g) i od prawej (h); wynik dla okna zaczynającego się
+# w i to op(h[i], g[i + k - 1]) - trzy porównania na próbkę niezależnie od k.
+# ----------------------------
+def running_extreme_1d(array, size, op, axis):
+    array = np.moveaxis(array, axis, -1)
+    length = array.shape[-1]
+    count = length - size + 1
+
+    # Element neutralny operacji dla dopełnienia do wielokrotności k
+    if np.issubdtype(array.dtype, np.integer):
+        info = np.iinfo(array.dtype)
+    else:
+        info = np.finfo(array.dtype)
+    identity = info.min if op is np.maximum else info.max
+
+    blocks = -(-length // size)
+    extended = np.full(array.shape[:-1] + (blocks * size,), identity, dtype=array.dtype)
+    extended[..., :length] = array
+    extended = extended.reshape(array.shape[:-1] + (blocks, size))
+
+    forward = op.accumulate(extended, axis=-1).reshape(array.shape[:-1] + (blocks * size,))
+    backward = op.accumulate(extended[..., ::-1], axis=-1)[..., ::-1].reshape(array.shape[:-1] + (blocks * size,))
+
+    result = op(backward[..., :count], forward[..., size - 1:size - 1 + count])
+    return np.moveaxis(result, -1, axis)
+
+
+# ----------------------------
+# Minimum/maksimum w oknie k x k - dwa przebiegi 1-D (kolumny, potem wiersze)
+# ----------------------------
+def running_min(padded, size):
+    return running_extreme_1d(running_extreme_1d(padded, size, np.minimum, 0), size, np.minimum, 1)
+
+
+def running_max(padded, size):
+    return running_extreme_1d(running_extreme_1d(padded, size, np.maximum, 0), size, np.maximum, 1)
+
+
+# ----------------------------
+# Mediana w oknie k x k na podstawie histogramu skumulowanego
+# Dla kolejnych poziomów jasności t występujących w obrazie liczona jest
+# (sumą w oknie) liczba pikseli <= t. Mediana to najmniejszy poziom, dla
+# którego liczba ta przekracza połowę okna. Koszt: jedna suma w oknie na
+# poziom jasności; pętla kończy się, gdy mediana jest znana dla wszystkich
+# pikseli. Dla nieparzystego k wynik jest identyczny z np.median.
+# Koszt rośnie z liczbą poziomów, więc dla obrazów o wielu poziomach
+# (więcej niż MEDIAN_LEVELS_PER_SIZE * k) liczona jest mediana
+# scipy.ndimage.median_filter (ten sam wynik) - na bonescan.tif (256 poziomów)
+# histogram jest szybszy tylko do ok. 30 poziomów dla k=3 i ok. 140 dla k=7.
+# ----------------------------
+MEDIAN_LEVELS_PER_SIZE = 10
+
+
+def histogram_median(padded, size):
+    height = padded.shape[0] - size + 1
+    width = padded.shape[1] - size + 1
+    half = (size * size) // 2 + 1
+
+    if padded.dtype == np.uint8:
+        levels = np.flatnonzero(np.bincount(padded.reshape(-1), minlength=256)).astype(np.uint8)
+    else:
+        levels = np.unique(padded)
+    if len(levels) > MEDIAN_LEVELS_PER_SIZE * size:
+        # Okna w całości wewnątrz dopełnionego obrazu - dopełnienie scipy nie ma wpływu
+        radius = size // 2
+        return median_filter(padded, size=size)[radius:radius + height, radius:radius + width]
+
+    median = np.zeros((height, width), dtype=padded.dtype)
+    unresolved = np.ones((height, width), dtype=bool)
+
+    for level in levels:
+        count = running_sum(padded <= level, size)
+        found = unresolved & (count >= half)
+        median[found] = level
+        unresolved &= ~found
+        if not unresolved.any():
+            break
+
+    return median
+
+
+# ----------------------------
+# Lokalne momenty w oknie k x k ze stałym kosztem na piksel (niezależnym od k)
+# Średnia i wariancja z dwóch tablic sum skumulowanych: sumy wartości
+# i sumy kwadratów. Dla obrazów całkowitych sumy są dokładne (int64),
+# więc wariancja (count * sum(x^2) - sum(x)^2) / count^2 nie traci precyzji
+# i nie bywa ujemna. Minimum i maksimum metodą van Herka / Gil-Wermana.
+# outputs - które z 'mean', 'variance', 'min', 'max' policzyć
+# Zwraca słownik {nazwa: tablica}
+# ----------------------------
+LOCAL_MOMENTS = ('mean', 'variance', 'min', 'max')
+
+
+def local_moments(padded, size, outputs=('mean', 'variance')):
+    unknown = set(outputs) - set(LOCAL_MOMENTS)
+    if unknown:
+        raise ValueError(f"Nieznane momenty: {sorted(unknown)}")
+    count = size * size
+    moments = {}
+    if 'mean' in outputs or 'variance' in outputs:
+        sums = box_sum(padded, size)
+        moments['mean'] = sums / count
+    if 'variance' in outputs:
+        if np.issubdtype(sums.dtype, np.integer):
+            squares = box_sum(np.square(padded, dtype=np.int64), size)
+            moments['variance'] = (squares * count - sums * sums) / (count * count)
+        else:
+            squares = box_sum(np.square(padded, dtype=np.float64), size)
+            moments['variance'] = np.maximum(squares / count - moments['mean'] ** 2, 0)
+    if 'min' in outputs:
+        moments['min'] = running_min(padded, size)
+    if 'max' in outputs:
+        moments['max'] = running_max(padded, size)
+    return {name: moments[name] for name in outputs}